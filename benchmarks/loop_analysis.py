@@ -0,0 +1,181 @@
+"""Benchmark the workflow loop analysis.
+
+Compares the chain enumeration `Workflow.get_loops` used to do against the
+strongly connected component analysis in `django_workflow_engine.graph`, and
+checks that both report the same loops.
+
+Run from the repository root:
+
+    python -m benchmarks.loop_analysis
+    python -m benchmarks.loop_analysis --blocks 1000 --diamonds 4
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import dropwhile
+from typing import List, Tuple
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+django.setup()
+
+from django_workflow_engine import COMPLETE  # noqa: E402
+from django_workflow_engine.dataclass import Step, Workflow  # noqa: E402
+from django_workflow_engine.graph import WorkflowGraph  # noqa: E402
+from django_workflow_engine.tests.workflows import (  # noqa: E402
+    complex_loops_workflow,
+    reminder_workflow,
+)
+
+
+def legacy_get_loops(workflow: Workflow) -> List[List[str]]:
+    """The chain enumeration `Workflow.get_loops` used before the graph."""
+    loops: List[List[str]] = []
+    chains: List[List[str]] = []
+
+    def get_step(step_id):
+        return next((step for step in workflow.steps if step.step_id == step_id), None)
+
+    first_step = next(step for step in workflow.steps if step.start)
+
+    def add_step_to_chains(previous_step_id: str, step_id: str):
+        step = get_step(step_id=step_id)
+        if not step:
+            return None
+
+        linked_chains: List[List[str]] = []
+        for chain in chains:
+            if previous_step_id == chain[-1]:
+                linked_chains.append(chain)
+
+        loop_detected = False
+
+        for linked_chain in linked_chains:
+            new_chain = linked_chain.copy()
+            if step_id in new_chain:
+                loop_detected = True
+                loop_chain = list(dropwhile(lambda x: x != step_id, new_chain))
+                loops.append(loop_chain)
+                linked_chains.remove(linked_chain)
+            else:
+                new_chain.append(step_id)
+                chains.append(new_chain)
+
+        if loop_detected:
+            return None
+
+        if step.targets != COMPLETE:
+            for target in step.targets:
+                add_step_to_chains(
+                    step_id=target,
+                    previous_step_id=step_id,
+                )
+
+    chains.append([first_step.step_id])
+
+    if first_step.targets != COMPLETE:
+        for target in first_step.targets:
+            add_step_to_chains(previous_step_id=first_step.step_id, step_id=target)
+
+    return loops
+
+
+def build_synthetic_workflow(blocks: int, diamonds: int) -> Workflow:
+    """Build a long workflow made of reminder loops and split/join diamonds.
+
+    Each block is a decision step that either loops back through a reminder
+    step or moves on to the next block. The last `diamonds` blocks are
+    preceded by a split into two branches that join up again, the legacy
+    enumeration is exponential in the number of diamonds.
+    """
+    steps: List[Step] = [
+        Step(step_id="start", task_name="basic_task", start=True, targets=["b0"])
+    ]
+
+    for i in range(blocks):
+        next_step_id = f"b{i + 1}" if i + 1 < blocks else "end"
+        entry = f"b{i}"
+
+        if i >= blocks - diamonds:
+            steps += [
+                Step(step_id=entry, task_name="basic_task", targets=[f"l{i}", f"r{i}"]),
+                Step(step_id=f"l{i}", task_name="basic_task", targets=[f"j{i}"]),
+                Step(step_id=f"r{i}", task_name="basic_task", targets=[f"j{i}"]),
+            ]
+            entry = f"j{i}"
+
+        steps += [
+            Step(
+                step_id=entry,
+                task_name="basic_task",
+                targets=[f"d{i}"],
+            ),
+            Step(
+                step_id=f"d{i}",
+                task_name="basic_task",
+                targets=[f"remind{i}", next_step_id],
+            ),
+            Step(
+                step_id=f"remind{i}",
+                task_name="basic_task",
+                targets=[f"d{i}"],
+            ),
+        ]
+
+    steps.append(Step(step_id="end", task_name="basic_task", targets=COMPLETE))
+
+    return Workflow(name=f"synthetic_{blocks}_{diamonds}", steps=steps)
+
+
+def unique(loops: List[List[str]]) -> List[Tuple[str, ...]]:
+    """The legacy enumeration repeats a loop once per path that reaches it."""
+    seen: List[Tuple[str, ...]] = []
+    for loop in loops:
+        if tuple(loop) not in seen:
+            seen.append(tuple(loop))
+    return seen
+
+
+def compare(workflow: Workflow) -> None:
+    started = time.perf_counter()
+    legacy_loops = legacy_get_loops(workflow)
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    graph = WorkflowGraph.compile(workflow)
+    graph_seconds = time.perf_counter() - started
+
+    assert unique(legacy_loops) == list(graph.loops), workflow.name
+    for step in workflow.steps:
+        legacy_last = any(step.step_id == loop[-1] for loop in legacy_loops)
+        assert legacy_last == (step.step_id in graph.last_in_loop), step.step_id
+
+    print(
+        f"{workflow.name:<32} steps={len(workflow.steps):<6} "
+        f"loops={len(graph.loops):<5} legacy={legacy_seconds * 1000:>10.2f}ms "
+        f"graph={graph_seconds * 1000:>8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=350)
+    parser.add_argument("--diamonds", type=int, default=3)
+    args = parser.parse_args()
+
+    # The legacy enumeration recurses once per step along the longest path.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), args.blocks * 10))
+
+    for workflow in (
+        reminder_workflow,
+        complex_loops_workflow,
+        build_synthetic_workflow(args.blocks, 0),
+        build_synthetic_workflow(args.blocks, args.diamonds),
+    ):
+        compare(workflow)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""Benchmark migration 0011, copying TaskRecordExecutions to TaskStatuses.
+
+Compares the per flow, per step copy migration 0011 used to do against the
+batched copy it does now, on a synthetic dataset in a temporary SQLite
+database, and checks that both create the same rows.
+
+Run from the repository root:
+
+    python -m benchmarks.migration_0011
+    python -m benchmarks.migration_0011 --flows 100000 --skip-legacy
+"""
+import argparse
+import importlib
+import os
+import tempfile
+import time
+from typing import Any, Callable, Set, Tuple
+
+import django
+from django.conf import settings
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+DATABASE_DIR = tempfile.TemporaryDirectory()
+settings.DATABASES["default"]["NAME"] = os.path.join(DATABASE_DIR.name, "db.sqlite3")
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.db.migrations.executor import MigrationExecutor  # noqa: E402
+
+from django_workflow_engine.tests.workflows import linear_workflow  # noqa: E402
+from django_workflow_engine.utils import lookup_workflow  # noqa: E402
+
+BEFORE_MIGRATION = ("django_workflow_engine", "0010_create_replacement_task_record")
+
+migration_0011 = importlib.import_module(
+    "django_workflow_engine.migrations.0011_migrate_from_taskrecordexecutions"
+)
+
+
+def legacy_migrate_from_taskrecordexecutions(apps, schema_editor):
+    """The copy migration 0011 used to do, with its TaskLog copy fixed."""
+    Flow = apps.get_model("django_workflow_engine", "Flow")
+    TaskStatus = apps.get_model("django_workflow_engine", "TaskStatus")
+    Target = apps.get_model("django_workflow_engine", "Target")
+    TaskLog = apps.get_model("django_workflow_engine", "TaskLog")
+    TaskRecordExecution = apps.get_model(
+        "django_workflow_engine", "TaskRecordExecution"
+    )
+    TaskRecordExecutionTarget = apps.get_model(
+        "django_workflow_engine", "TaskRecordExecutionTarget"
+    )
+    TaskRecordExecutionTaskLog = apps.get_model(
+        "django_workflow_engine", "TaskRecordExecutionTaskLog"
+    )
+
+    for flow in Flow.objects.all():
+        workflow = lookup_workflow(flow.workflow_name)
+        for step in workflow.steps:
+            task_execution = (
+                TaskRecordExecution.objects.filter(flow=flow, step_id=step.step_id)
+                .order_by("-started_at")
+                .first()
+            )
+            if not task_execution:
+                continue
+
+            task_status = TaskStatus.objects.create(
+                flow=flow,
+                step_id=step.step_id,
+                started_at=task_execution.started_at,
+                executed_at=task_execution.executed_at,
+                executed_by=task_execution.executed_by,
+                task_name=task_execution.task_name,
+                task_info=task_execution.task_info,
+                done=task_execution.done,
+            )
+
+            for target in TaskRecordExecutionTarget.objects.filter(
+                task_record=task_execution
+            ):
+                Target.objects.create(
+                    target_string=target.target_string,
+                    task_status=task_status,
+                )
+
+            for task_log in TaskRecordExecutionTaskLog.objects.filter(
+                task_record=task_execution
+            ):
+                TaskLog.objects.create(
+                    logged_at=task_log.logged_at,
+                    message=task_log.message,
+                    task_status=task_status,
+                )
+
+
+def create_dataset(apps, flows: int, executions: int) -> None:
+    """Create flows of the linear workflow with `executions` executions per
+    step, each with a target and a log."""
+    User = apps.get_model("auth", "User")
+    Flow = apps.get_model("django_workflow_engine", "Flow")
+    TaskRecordExecution = apps.get_model(
+        "django_workflow_engine", "TaskRecordExecution"
+    )
+    TaskRecordExecutionTarget = apps.get_model(
+        "django_workflow_engine", "TaskRecordExecutionTarget"
+    )
+    TaskRecordExecutionTaskLog = apps.get_model(
+        "django_workflow_engine", "TaskRecordExecutionTaskLog"
+    )
+
+    user = User.objects.create(username="benchmark")
+    Flow.objects.bulk_create(
+        [
+            Flow(
+                workflow_name="benchmark",
+                flow_name=f"flow_{i}",
+                executed_by_id=user.pk,
+            )
+            for i in range(flows)
+        ],
+        batch_size=1000,
+    )
+
+    for flow_pk in Flow.objects.values_list("pk", flat=True).iterator():
+        task_executions = TaskRecordExecution.objects.bulk_create(
+            [
+                TaskRecordExecution(
+                    flow_id=flow_pk,
+                    step_id=step.step_id,
+                    task_name=step.task_name,
+                    done=execution == executions - 1,
+                )
+                for step in linear_workflow.steps
+                for execution in range(executions)
+            ]
+        )
+        TaskRecordExecutionTarget.objects.bulk_create(
+            [
+                TaskRecordExecutionTarget(
+                    task_record_id=task_execution.pk,
+                    target_string=f"{task_execution.step_id}_{task_execution.pk}",
+                )
+                for task_execution in task_executions
+            ]
+        )
+        TaskRecordExecutionTaskLog.objects.bulk_create(
+            [
+                TaskRecordExecutionTaskLog(
+                    task_record_id=task_execution.pk,
+                    message=f"Executed {task_execution.pk}",
+                )
+                for task_execution in task_executions
+            ]
+        )
+
+
+def snapshot(apps) -> Tuple[Set[Any], Set[Any], Set[Any]]:
+    TaskStatus = apps.get_model("django_workflow_engine", "TaskStatus")
+    Target = apps.get_model("django_workflow_engine", "Target")
+    TaskLog = apps.get_model("django_workflow_engine", "TaskLog")
+
+    return (
+        set(
+            TaskStatus.objects.values_list(
+                "flow_id", "step_id", "task_name", "done", "executed_at"
+            )
+        ),
+        set(
+            Target.objects.values_list(
+                "task_status__flow_id", "task_status__step_id", "target_string"
+            )
+        ),
+        set(
+            TaskLog.objects.values_list(
+                "task_status__flow_id", "task_status__step_id", "message"
+            )
+        ),
+    )
+
+
+def clear(apps) -> None:
+    for model_name in ["TaskLog", "Target", "TaskStatus"]:
+        apps.get_model("django_workflow_engine", model_name).objects.all().delete()
+
+
+def run(name: str, migrate: Callable, apps) -> Tuple[Set[Any], Set[Any], Set[Any]]:
+    queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    with connection.execute_wrapper(count_queries), transaction.atomic():
+        migrate(apps, None)
+    seconds = time.perf_counter() - started
+
+    print(f"{name:<8} {seconds:>10.2f}s {queries:>10} queries")
+    return snapshot(apps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", type=int, default=1000)
+    parser.add_argument("--executions", type=int, default=2)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    settings.DJANGO_WORKFLOWS = {"benchmark": linear_workflow}
+    call_command("migrate", *BEFORE_MIGRATION, verbosity=0)
+    apps = MigrationExecutor(connection).loader.project_state([BEFORE_MIGRATION]).apps
+
+    create_dataset(apps, args.flows, args.executions)
+    print(
+        f"flows={args.flows} steps={len(linear_workflow.steps)} "
+        f"executions={args.executions}"
+    )
+
+    legacy_rows = None
+    if not args.skip_legacy:
+        legacy_rows = run("legacy", legacy_migrate_from_taskrecordexecutions, apps)
+        clear(apps)
+
+    batched_rows = run(
+        "batched", migration_0011.migrate_from_taskrecordexecutions, apps
+    )
+
+    if legacy_rows is not None:
+        assert legacy_rows == batched_rows, "The migrations created different rows"
+
+
+if __name__ == "__main__":
+    main()
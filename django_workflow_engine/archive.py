@@ -0,0 +1,287 @@
+"""django_workflow_engine archiving.
+
+Flows, and their TaskStatuses, Targets and TaskLogs, are kept forever unless
+they are archived. Archiving writes finished flows to a JSON lines file (one
+flow with its tasks per line, usually gzipped) and deletes them, a batch at a
+time, so that the tables the executor and views query stay small. See the
+`archive_workflow_flows` management command.
+
+A batch is written to the file before it is deleted, so a flow can appear in
+the file more than once if archiving it was interrupted and ran again. Read
+archived flows with `read_archived_flows`, which skips the repeats.
+"""
+import io
+import json
+import os
+from collections import defaultdict
+from datetime import timedelta
+from typing import IO, Any, Collection, Dict, Iterator, List, Type
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Model, QuerySet
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+
+from django_workflow_engine.models import (
+    Flow,
+    JoinBarrier,
+    OutboxEmail,
+    Target,
+    TaskLog,
+    TaskStatus,
+)
+
+# The tables of the legacy TaskRecordExecution models, which were removed by
+# migration 0016. They are queried with SQL as the models no longer exist.
+LEGACY_TASK_RECORD_TABLE = "django_workflow_engine_taskrecordexecution"
+LEGACY_TARGET_TABLE = "django_workflow_engine_taskrecordexecutiontarget"
+LEGACY_TASK_LOG_TABLE = "django_workflow_engine_taskrecordexecutiontasklog"
+
+
+def archivable_flows(older_than: timedelta) -> QuerySet[Flow]:
+    """Flows that finished more than `older_than` ago."""
+    return Flow.objects.filter(finished__lt=timezone.now() - older_than).order_by("pk")
+
+
+def archive_flows(
+    file: IO[str], older_than: timedelta, batch_size: int = 500
+) -> Iterator[int]:
+    """Archive the flows that finished more than `older_than` ago.
+
+    Each batch of flows is written to `file`, flushed and synced to disk, then
+    deleted, in one transaction per batch. If the delete is rolled back the
+    batch stays in the file and is written again by the next run.
+
+    :param (IO[str]) file: A text file to write the flows to, e.g. one opened
+        with `gzip.open(path, "wt")`.
+    :param (timedelta) older_than: How long ago the flows must have finished.
+    :param (int) batch_size: The number of flows to archive per transaction.
+    :returns (Iterator[int]): The number of flows archived in each batch.
+    """
+    last_pk = 0
+
+    while True:
+        flow_pks: List[int] = list(
+            archivable_flows(older_than)
+            .filter(pk__gt=last_pk)
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not flow_pks:
+            return
+
+        with transaction.atomic():
+            for record in serialize_flows(flow_pks):
+                file.write(json.dumps(record, cls=DjangoJSONEncoder) + "\n")
+            sync_file(file)
+            delete_flows(flow_pks)
+
+        last_pk = flow_pks[-1]
+        yield len(flow_pks)
+
+
+def sync_file(file: IO[str]) -> None:
+    """Flush a file and, if it is backed by one, sync it to disk."""
+    file.flush()
+
+    try:
+        fileno = file.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return
+
+    os.fsync(fileno)
+
+
+def read_archived_flows(file: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Read the flows written by `archive_flows`.
+
+    A flow written more than once, by an archive run whose delete was rolled
+    back, is only returned the first time.
+
+    :param (IO[str]) file: A text file of archived flows, e.g. one opened with
+        `gzip.open(path, "rt")`.
+    :returns (Iterator[dict]): A record per flow, see `serialize_flows`.
+    """
+    flow_pks = set()
+
+    for line in file:
+        record = json.loads(line)
+        if record["flow"]["id"] not in flow_pks:
+            flow_pks.add(record["flow"]["id"])
+            yield record
+
+
+def serialize_flows(flow_pks: List[int]) -> List[Dict[str, Any]]:
+    """Serialize flows with their TaskStatuses, Targets and TaskLogs.
+
+    :param (list[int]) flow_pks: The flows to serialize.
+    :returns (list[dict]): A record per flow, e.g.
+        `{"flow": {...}, "tasks": [{..., "targets": [...], "log": [...]}]}`.
+    """
+    targets: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for target in Target.objects.filter(task_status__flow_id__in=flow_pks).values():
+        targets[target["task_status_id"]].append(target)
+
+    logs: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for task_log in (
+        TaskLog.objects.filter(task_status__flow_id__in=flow_pks)
+        .order_by("pk")
+        .values()
+    ):
+        logs[task_log["task_status_id"]].append(task_log)
+
+    tasks: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for task_status in (
+        TaskStatus.objects.filter(flow_id__in=flow_pks).order_by("pk").values()
+    ):
+        task_status["targets"] = targets[task_status["id"]]
+        task_status["log"] = logs[task_status["id"]]
+        tasks[task_status["flow_id"]].append(task_status)
+
+    return [
+        {"flow": flow, "tasks": tasks[flow["id"]]}
+        for flow in Flow.objects.filter(pk__in=flow_pks).order_by("pk").values()
+    ]
+
+
+def delete_flows(flow_pks: List[int]) -> None:
+    """Delete flows, deleting the rows that reference them first.
+
+    The rows are deleted child first with one DELETE per table. Once their
+    children are gone, TaskStatuses and Flows are deleted without Django's
+    cascade collector, which would otherwise load every row being deleted.
+    OutboxEmails are unlinked rather than deleted, they are kept until they
+    are sent.
+
+    If other models reference Flows or TaskStatuses, or delete signals are
+    connected for them, the flows are deleted with `QuerySet.delete()` so
+    that their cascades and signals run.
+    """
+    OutboxEmail.objects.filter(task_status__flow_id__in=flow_pks).update(
+        task_status=None
+    )
+
+    if not (
+        can_raw_delete(Flow, [TaskStatus, JoinBarrier])
+        and can_raw_delete(TaskStatus, [Target, TaskLog, OutboxEmail])
+    ):
+        Flow.objects.filter(pk__in=flow_pks).delete()
+        return
+
+    JoinBarrier.objects.filter(flow_id__in=flow_pks).delete()
+    TaskLog.objects.filter(task_status__flow_id__in=flow_pks).delete()
+    Target.objects.filter(task_status__flow_id__in=flow_pks).delete()
+    raw_delete(TaskStatus.objects.filter(flow_id__in=flow_pks))
+    raw_delete(Flow.objects.filter(pk__in=flow_pks))
+
+
+def can_raw_delete(model: Type[Model], deleted_first: Collection[Type[Model]]) -> bool:
+    """Whether the rows of a model can be deleted with `raw_delete` once the
+    rows of `deleted_first` that reference them are gone.
+
+    :param (type) model: The model to delete the rows of.
+    :param (Collection[type]) deleted_first: The models referencing `model`
+        whose rows are deleted or unlinked beforehand.
+    :returns (bool): False if other models reference `model`, or if delete
+        signals are connected for it.
+    """
+    if pre_delete.has_listeners(model) or post_delete.has_listeners(model):
+        return False
+
+    return all(
+        relation.related_model in deleted_first
+        for relation in model._meta.related_objects
+    )
+
+
+def raw_delete(queryset: QuerySet) -> int:
+    """Delete the rows of a queryset with a single DELETE, skipping cascades
+    and signals."""
+    return queryset._raw_delete(queryset.db)
+
+
+def legacy_task_records_exist() -> bool:
+    """Whether the legacy TaskRecordExecution tables are still there."""
+    return LEGACY_TASK_RECORD_TABLE in connection.introspection.table_names()
+
+
+def export_legacy_task_records(
+    file: IO[str], batch_size: int = 1000, delete: bool = False
+) -> Iterator[int]:
+    """Export the rows of the legacy TaskRecordExecution tables.
+
+    Writes a JSON line per TaskRecordExecution with its targets and logs, a
+    batch at a time, before migration 0016 drops the tables.
+
+    :param (IO[str]) file: A text file to write the task records to.
+    :param (int) batch_size: The number of task records to export per
+        transaction.
+    :param (bool) delete: Delete the task records once they are written.
+    :returns (Iterator[int]): The number of task records exported in each batch.
+    """
+    quote_name = connection.ops.quote_name
+    last_pk = 0
+
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            task_records = fetch_dicts(
+                cursor,
+                f"SELECT * FROM {quote_name(LEGACY_TASK_RECORD_TABLE)} "
+                "WHERE id > %s ORDER BY id LIMIT %s",
+                [last_pk, batch_size],
+            )
+            if not task_records:
+                return
+
+            pks = [task_record["id"] for task_record in task_records]
+            in_pks = f"IN ({', '.join(['%s'] * len(pks))})"
+
+            targets: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+            for target in fetch_dicts(
+                cursor,
+                f"SELECT * FROM {quote_name(LEGACY_TARGET_TABLE)} "
+                f"WHERE task_record_id {in_pks} ORDER BY id",
+                pks,
+            ):
+                targets[target["task_record_id"]].append(target)
+
+            logs: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+            for task_log in fetch_dicts(
+                cursor,
+                f"SELECT * FROM {quote_name(LEGACY_TASK_LOG_TABLE)} "
+                f"WHERE task_record_id {in_pks} ORDER BY id",
+                pks,
+            ):
+                logs[task_log["task_record_id"]].append(task_log)
+
+            for task_record in task_records:
+                if isinstance(task_record["task_info"], str):
+                    task_record["task_info"] = json.loads(task_record["task_info"])
+                task_record["targets"] = targets[task_record["id"]]
+                task_record["log"] = logs[task_record["id"]]
+                file.write(json.dumps(task_record, cls=DjangoJSONEncoder) + "\n")
+            file.flush()
+
+            if delete:
+                for table in [
+                    LEGACY_TASK_LOG_TABLE,
+                    LEGACY_TARGET_TABLE,
+                ]:
+                    cursor.execute(
+                        f"DELETE FROM {quote_name(table)} WHERE task_record_id {in_pks}",
+                        pks,
+                    )
+                cursor.execute(
+                    f"DELETE FROM {quote_name(LEGACY_TASK_RECORD_TABLE)} WHERE id {in_pks}",
+                    pks,
+                )
+
+        last_pk = pks[-1]
+        yield len(task_records)
+
+
+def fetch_dicts(cursor, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+    """Run a query and return its rows as dicts keyed by column name."""
+    cursor.execute(sql, params)
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
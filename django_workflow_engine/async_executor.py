@@ -0,0 +1,253 @@
+"""django_workflow_engine async executor.
+
+Runs flows from async code (e.g. an ASGI view) without blocking the event loop.
+Requires Django 4.2 or later for the async ORM methods it uses.
+"""
+import asyncio
+import logging
+from typing import TYPE_CHECKING, List, Literal, Optional, Tuple, Union
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from django_workflow_engine.exceptions import WorkflowError, WorkflowNotAuthError
+from django_workflow_engine.executor import (
+    RETARGETED_FIELDS,
+    WorkflowExecutor,
+    retarget_task_status,
+    unpack_task_result,
+    wave_needs_saving,
+)
+from django_workflow_engine.models import TaskStatus
+
+if TYPE_CHECKING:
+    from django.contrib.auth.models import User
+
+    from django_workflow_engine.dataclass import Step
+    from django_workflow_engine.tasks.task import Task
+else:
+    User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+# An executed task, with the targets and done flag it returned.
+ExecutedTask = Tuple["Task", Optional[Union[List[str], Literal["complete"]]], bool]
+
+
+class AsyncWorkflowExecutor(WorkflowExecutor):
+    """Async version of `WorkflowExecutor`.
+
+    The steps in a wave are executed concurrently with `asyncio.gather`, so
+    independent branches of a split run at the same time. Tasks run through
+    `Task.aexecute`, which falls back to running `Task.execute` in a thread.
+    The results of a wave are applied in step order once every task in it has
+    finished, so the saved state doesn't depend on which task finished first.
+    """
+
+    async def arun_flow(self, user: User) -> None:
+        """
+        Run the workflow, see `WorkflowExecutor.run_flow`.
+
+        :param (User) user: User requesting to run a flow step.
+        """
+        if not await sync_to_async(self.flow.acquire_lease)(self.lease_owner):
+            raise WorkflowError("Flow already running")
+
+        finished: bool = False
+
+        try:
+            # Initialise runs starting for the first time.
+            if not await self.flow.tasks.all().aexists():
+                await self.aget_or_create_task_status(
+                    step=self.flow.workflow.first_step
+                )
+                self.flow.started = timezone.now()
+                await self.flow.asave(update_fields=["started"])
+
+            # Progress the workflow
+            await self.aexecute_steps(user=user)
+
+            # If the flow has no remaining steps, then we are done.
+            finished = not await self.aget_current_steps()
+        finally:
+            # Release the lease, so that the flow can be picked up again.
+            await sync_to_async(self.flow.release_lease)(
+                self.lease_owner, finished=finished
+            )
+
+    async def aexecute_steps(self, user: User) -> None:
+        """
+        Execute any steps that have not been complete, a wave at a time.
+        """
+        self._task_statuses = {}
+        async for task_status in self.flow.tasks.order_by("-pk"):
+            self._task_statuses[task_status.step_id] = task_status
+
+        try:
+            previous_steps: List["Step"] = []
+            current_steps = self._get_frontier()
+
+            while current_steps:
+                if wave_needs_saving(previous_steps, current_steps):
+                    await sync_to_async(self.save_pending_changes)()
+
+                break_flow: bool = False
+                executed: bool = False
+
+                results = await asyncio.gather(
+                    *(
+                        self._aexecute_task(user=user, step=current_step)
+                        for current_step in current_steps
+                    ),
+                    return_exceptions=True,
+                )
+
+                for current_step, result in zip(current_steps, results):
+                    if result is None:
+                        # A manual task.
+                        continue
+
+                    executed = True
+
+                    if isinstance(result, Exception):
+                        logger.error(result, exc_info=result)
+                        break_flow = True
+                        continue
+
+                    if isinstance(result, BaseException):
+                        raise result
+
+                    try:
+                        current_step_break_flow = await self._acomplete_step(
+                            user, current_step, result
+                        )
+                    except Exception as e:
+                        logger.exception(e)
+                        current_step_break_flow = True
+
+                    # We want to toggle break_flow to True, but not back to False.
+                    break_flow = break_flow or current_step_break_flow
+
+                if self._barrier_arrivals or self._branch_ended:
+                    await sync_to_async(self.schedule_ready_joins)()
+                await sync_to_async(self._renew_lease)()
+
+                # If we have broken the flow, or only manual steps are left, then
+                # we are done, any remaining tasks will be picked up next time.
+                if break_flow or not executed:
+                    break
+
+                previous_steps = current_steps
+                current_steps = self._get_frontier()
+        finally:
+            await sync_to_async(self.save_pending_changes)()
+            self._task_statuses = None
+
+    async def aexecute_step(self, user: User, step: "Step") -> bool:
+        """
+        Execute the task for the given step, see `WorkflowExecutor.execute_step`.
+
+        :returns (bool): Whether the flow should stop after this step.
+        """
+        try:
+            result = await self._aexecute_task(user=user, step=step)
+            if result is None:
+                return False
+            return await self._acomplete_step(user, step, result)
+        finally:
+            if self._task_statuses is None:
+                await sync_to_async(self.save_pending_changes)()
+
+    async def _aexecute_task(self, user: User, step: "Step") -> Optional[ExecutedTask]:
+        """
+        Execute the task for the given step, without saving anything.
+
+        :returns: The task and its result, or None if the task is manual.
+        """
+        task_status, _ = await self.aget_or_create_task_status(step=step)
+
+        task = step.task(user, task_status, self.flow)
+        try:
+            await sync_to_async(task.setup)(task_status.task_info)
+
+            # Check if this task is automatic or manual
+            if not task.auto:
+                return None
+
+            # Raises if user not authorised for step
+            await self.acheck_authorised(user, step)
+
+            targets, task_done = unpack_task_result(
+                task_status, await task.aexecute(task_status.task_info)
+            )
+        finally:
+            # Save what the task logged with the wave, even if it raised.
+            self._new_task_logs += task.collect_log()
+
+        return task, targets, task_done
+
+    async def _acomplete_step(
+        self, user: User, step: "Step", result: ExecutedTask
+    ) -> bool:
+        """
+        Save the result of an executed task and queue up the next steps.
+        """
+        task, targets, task_done = result
+
+        self.mark_executed(user=user, task_status=task.task_status, done=task_done)
+        self.save_executed(task)
+
+        # Looking up the targets can hit the database, e.g. outside of
+        # aexecute_steps or to save a target whose task has changed.
+        return await sync_to_async(self.apply_targets)(
+            step, task.task_status, targets, task_done
+        )
+
+    async def aget_or_create_task_status(self, step: "Step") -> Tuple[TaskStatus, bool]:
+        """
+        Get or create a TaskStatus for a given Step.
+        """
+        task_status: Optional[TaskStatus] = None
+        if self._task_statuses is not None:
+            task_status = self._task_statuses.get(step.step_id)
+
+        if task_status:
+            created = False
+        else:
+            task_status, created = await TaskStatus.objects.aget_or_create(
+                flow=self.flow,
+                step_id=step.step_id,
+                defaults={
+                    "task_name": step.task_name,
+                    "task_info": step.task_info or {},
+                },
+            )
+
+        if retarget_task_status(task_status, step):
+            await task_status.asave(update_fields=RETARGETED_FIELDS)
+
+        if self._task_statuses is not None:
+            self._task_statuses.setdefault(step.step_id, task_status)
+
+        return task_status, created
+
+    async def aget_current_steps(self) -> List["Step"]:
+        """
+        Get the current steps.
+        """
+        return await sync_to_async(self.get_current_steps)()
+
+    @staticmethod
+    async def acheck_authorised(user: User, step: "Step"):
+        """Check if a user is authorised to execute a workflow step.
+
+        :raises (WorkflowNotAuthError): If user is not authorised.
+        """
+        if not step.groups:
+            return
+
+        if await user.groups.filter(name__in=step.groups).aexists():
+            return
+        msg = f"User '{user}' is not authorised to execute the step: {step.task_name}"
+        raise WorkflowNotAuthError(msg)
@@ -3,9 +3,10 @@
 Dataclasses that are used to define a custom workflow and its steps.
 """
 from dataclasses import dataclass, field
-from itertools import dropwhile
+from functools import cached_property
 from typing import List, Literal, Optional, Type, Union
 
+from django_workflow_engine.graph import WorkflowGraph
 from django_workflow_engine.tasks import Task
 
 
@@ -19,6 +20,9 @@ class Step:
     description: Optional[str] = None
     groups: List[str] = field(default_factory=list)
     no_log: Optional[bool] = False
+    no_parallel: Optional[bool] = False
+    # Only schedule this step once every step that targets it has arrived.
+    barrier: Optional[bool] = False
 
     @property
     def task(self) -> Type[Task]:
@@ -33,65 +37,25 @@ class Workflow:
     name: str
     steps: list[Step]
 
+    @cached_property
+    def graph(self) -> WorkflowGraph:
+        """
+        The compiled graph for this workflow, built on first access.
+
+        Workflows are treated as immutable once they are in use, changes to
+        `steps` after this point are not picked up.
+        """
+        return WorkflowGraph.compile(self)
+
     def get_step(self, step_id) -> Optional[Step]:
-        return next((step for step in self.steps if step.step_id == step_id), None)
+        return self.graph.get_step(step_id)
 
     @property
-    def first_step(self):
-        return next(step for step in self.steps if step.start)
+    def first_step(self) -> Step:
+        return self.graph.first_step
 
     def get_loops(self) -> List[List[str]]:
-        loops: List[List[str]] = []
-        chains: List[List[str]] = []
-
-        def add_step_to_chains(previous_step_id: str, step_id: str):
-            step = self.get_step(step_id=step_id)
-            if not step:
-                return None
-
-            linked_chains: List[List[str]] = []
-            for chain in chains:
-                if previous_step_id == chain[-1]:
-                    linked_chains.append(chain)
-
-            loop_detected = False
-
-            for linked_chain in linked_chains:
-                new_chain = linked_chain.copy()
-                if step_id in new_chain:
-                    loop_detected = True
-                    loop_chain = list(dropwhile(lambda x: x != step_id, new_chain))
-                    loops.append(loop_chain)
-                    linked_chains.remove(linked_chain)
-                else:
-                    new_chain.append(step_id)
-                    chains.append(new_chain)
-
-            if loop_detected:
-                return None
-
-            if step.targets != "complete":
-                for target in step.targets:
-                    add_step_to_chains(
-                        step_id=target,
-                        previous_step_id=step_id,
-                    )
-
-        chains.append([self.first_step.step_id])
-
-        if self.first_step.targets != "complete":
-            for target in self.first_step.targets:
-                add_step_to_chains(
-                    previous_step_id=self.first_step.step_id, step_id=target
-                )
-
-        return loops
+        return [list(loop) for loop in self.graph.loops]
 
     def step_last_in_loop(self, step_id: str) -> bool:
-        loops = self.get_loops()
-
-        for loop in loops:
-            if step_id == loop[-1]:
-                return True
-
-        return False
+        return step_id in self.graph.last_in_loop
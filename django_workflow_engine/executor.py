@@ -1,29 +1,85 @@
 import logging
-from typing import TYPE_CHECKING, List, Optional, Tuple, Type
+import uuid
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from django.contrib.auth import get_user_model
+from django.db import connection, transaction
 from django.utils import timezone
 
 from django_workflow_engine import COMPLETE
 from django_workflow_engine.exceptions import WorkflowError, WorkflowNotAuthError
-from django_workflow_engine.models import Target, TaskStatus
+from django_workflow_engine.models import (
+    JoinBarrier,
+    OutboxEmail,
+    Target,
+    TaskLog,
+    TaskStatus,
+)
+from django_workflow_engine.tasks import RunAfter
+from django_workflow_engine.utils import get_lease_duration, get_parallel_workers
 
 if TYPE_CHECKING:
     from django.contrib.auth.models import User
 
     from django_workflow_engine.dataclass import Step
     from django_workflow_engine.models import Flow
-    from django_workflow_engine.tasks.task import Task
+    from django_workflow_engine.tasks.task import Task, TaskResult
 else:
     User = get_user_model()
 
 
 logger = logging.getLogger(__name__)
 
+# The TaskStatus fields that are set when its task is executed.
+EXECUTED_FIELDS = ["done", "executed_by", "executed_at", "run_after"]
+
+# The TaskStatus fields that are set when the task of its step has changed.
+RETARGETED_FIELDS = ["task_name", "task_info", *EXECUTED_FIELDS]
+
 
 class WorkflowExecutor:
-    def __init__(self, flow: "Flow"):
+    def __init__(
+        self,
+        flow: "Flow",
+        lease_owner: Optional[str] = None,
+        parallel_workers: Optional[int] = None,
+    ):
         self.flow: "Flow" = flow
+        # Identifies this executor as the holder of the flow's lease.
+        self.lease_owner: str = lease_owner or uuid.uuid4().hex
+        # Run the tasks of a wave in a thread pool of this size, if more than 1.
+        self.parallel_workers: int = (
+            get_parallel_workers() if parallel_workers is None else parallel_workers
+        )
+        # The flow's TaskStatuses keyed by step id, only held during execute_steps.
+        self._task_statuses: Optional[Dict[str, TaskStatus]] = None
+        # Changes to save once the steps have been executed, see
+        # save_pending_changes.
+        self._new_task_statuses: List[TaskStatus] = []
+        self._new_targets: List[Target] = []
+        self._new_task_logs: List[TaskLog] = []
+        self._new_outbox_emails: List[OutboxEmail] = []
+        # Saved TaskStatuses that have been executed or reset, keyed by pk.
+        self._changed_task_statuses: Dict[int, TaskStatus] = {}
+        # The predecessors that have arrived at each join barrier step, see
+        # `Step.barrier`.
+        self._barrier_arrivals: Dict[str, Set[str]] = defaultdict(set)
+        # Whether an executed step didn't schedule every step it targets in the
+        # workflow, which can leave a join barrier with nothing left to wait for.
+        self._branch_ended: bool = False
 
     def run_flow(self, user: User) -> None:
         """
@@ -32,75 +88,191 @@ class WorkflowExecutor:
         We identify the current step and execute workflow steps until a manual
         step is encountered (e.g. complete a form) or the workflow is exhausted.
 
+        The flow is leased to this executor while it runs, so that it can't be
+        run concurrently. If the process dies the lease expires and the flow can
+        be picked up again.
+
         :param (User) user: User requesting to run a flow step.
         """
 
-        if self.flow.running:
+        if not self.flow.acquire_lease(self.lease_owner):
             raise WorkflowError("Flow already running")
 
-        # Mark the flow as running (an attempt to prevent concurrent execution of the same Flow)
-        self.flow.running = True
-        self.flow.save(update_fields=["running"])
-
-        # Initialise runs starting for the first time.
-        if not self.flow.tasks.all().exists():
-            self.get_or_create_task_status(step=self.flow.workflow.first_step)
-            self.flow.started = timezone.now()
-            self.flow.save(update_fields=["started"])
+        finished: bool = False
 
         try:
+            # Initialise runs starting for the first time.
+            if not self.flow.tasks.all().exists():
+                self.get_or_create_task_status(step=self.flow.workflow.first_step)
+                self.flow.started = timezone.now()
+                self.flow.save(update_fields=["started"])
+
             # Progress the workflow
             self.execute_steps(user=user)
-        except Exception as e:
-            self.flow.running = False
-            self.flow.save(update_fields=["running"])
-            raise e
 
-        # If the flow has no remaining steps, then we are done.
-        remaining_steps = self.get_current_steps()
-        if not remaining_steps:
-            self.flow.finished = timezone.now()
+            # If the flow has no remaining steps, then we are done.
+            finished = not self.get_current_steps()
+        finally:
+            # Release the lease, so that the flow can be picked up again.
+            self.flow.release_lease(self.lease_owner, finished=finished)
 
-        # Mark the flow as not running, so that it can be picked up again.
-        self.flow.running = False
-        self.flow.save(update_fields=["running", "finished"])
-
-    def execute_steps(self, user: User):
+    def execute_steps(self, user: User) -> None:
         """
         Execute any steps that have not been complete.
 
-        This function is recursive/self referencing.
+        The flow's TaskStatuses are loaded once and the steps that are ready to
+        run (the frontier) are worked out in memory after each wave of steps.
+        What the waves changed is saved to the database in bulk between waves,
+        only waves whose tasks all set `reads_task_statuses` to False are saved
+        together, see `wave_needs_saving`.
+
+        With `parallel_workers` set, the tasks of a wave are run in a thread
+        pool, see `_execute_wave_in_parallel`. Inside a transaction they are
+        run one after another instead, as the pool's threads have their own
+        database connections that can't see the transaction's rows.
+        """
+        self._task_statuses = {}
+        for task_status in self.flow.tasks.order_by("-pk"):
+            self._task_statuses[task_status.step_id] = task_status
+
+        pool: Optional[ThreadPoolExecutor] = None
+        parallel: bool = self.parallel_workers > 1 and not connection.in_atomic_block
+
+        try:
+            previous_steps: List["Step"] = []
+            current_steps = self._get_frontier()
+
+            while current_steps:
+                if wave_needs_saving(previous_steps, current_steps):
+                    self.save_pending_changes()
+
+                if parallel and len(current_steps) > 1:
+                    if pool is None:
+                        pool = ThreadPoolExecutor(max_workers=self.parallel_workers)
+                    break_flow, executed = self._execute_wave_in_parallel(
+                        pool, user=user, steps=current_steps
+                    )
+                else:
+                    break_flow, executed = self._execute_wave(
+                        user=user, steps=current_steps
+                    )
+
+                self.schedule_ready_joins()
+                self._renew_lease()
+
+                # If we have broken the flow, or only manual steps are left, then
+                # we are done, any remaining tasks will be picked up next time.
+                if break_flow or not executed:
+                    break
+
+                previous_steps = current_steps
+                current_steps = self._get_frontier()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            self.save_pending_changes()
+            self._task_statuses = None
+
+    def _execute_wave(self, user: User, steps: List["Step"]) -> Tuple[bool, bool]:
+        """
+        Execute a wave of steps one after another.
+
+        :returns (tuple): Whether the flow should stop after this wave, and
+            whether any task was executed.
         """
         break_flow: bool = False
+        executed: bool = False
 
-        # Get all of the steps that need to be executed.
-        current_steps = self.get_current_steps()
+        for step in steps:
+            try:
+                step_break_flow, step_executed = self._execute_step(
+                    user=user, step=step
+                )
+            except Exception as e:
+                logger.exception(e)
+                step_break_flow, step_executed = True, True
+
+            # We want to toggle these to True, but not back to False.
+            break_flow = break_flow or step_break_flow
+            executed = executed or step_executed
+
+        return break_flow, executed
+
+    def _execute_wave_in_parallel(
+        self, pool: ThreadPoolExecutor, user: User, steps: List["Step"]
+    ) -> Tuple[bool, bool]:
+        """
+        Execute a wave of steps, running their tasks in a thread pool.
 
-        # If there is nothing to execute, then we are done.
-        if not current_steps:
-            return break_flow
+        Tasks are set up and authorised one after another, then every task
+        whose step isn't marked `no_parallel` is executed in the pool while the
+        others are executed in this thread. Once they have all finished, the
+        results are saved in step order, so the outcome doesn't depend on
+        which task finished first.
 
-        # Execute the steps.
-        for current_step in current_steps:
+        :returns (tuple): Whether the flow should stop after this wave, and
+            whether any task was executed.
+        """
+        break_flow: bool = False
+        executed: bool = False
+
+        tasks: List[Tuple["Step", "Task"]] = []
+        for step in steps:
+            task: Optional["Task"] = None
             try:
-                current_step_break_flow = self.execute_step(
-                    user=user, step=current_step
+                task = self.get_task(user=user, step=step)
+                if task.auto:
+                    self.check_authorised(user, step)
+            except Exception as e:
+                logger.exception(e)
+                break_flow = executed = True
+                if task:
+                    self._new_task_logs += task.collect_log()
+                continue
+
+            if task.auto:
+                tasks.append((step, task))
+            else:
+                self._new_task_logs += task.collect_log()
+
+        results: Dict[str, Union[Future, "TaskResult", Exception]] = {}
+        for step, task in tasks:
+            if not step.no_parallel:
+                results[step.step_id] = pool.submit(execute_task_in_thread, task)
+        for step, task in tasks:
+            if step.no_parallel:
+                try:
+                    results[step.step_id] = task.execute(task.task_status.task_info)
+                except Exception as e:
+                    results[step.step_id] = e
+
+        for step, task in tasks:
+            executed = True
+            try:
+                result = results[step.step_id]
+                if isinstance(result, Future):
+                    result = result.result()
+                if isinstance(result, Exception):
+                    raise result
+
+                targets, task_done = unpack_task_result(task.task_status, result)
+                self.mark_executed(
+                    user=user, task_status=task.task_status, done=task_done
+                )
+                self.save_executed(task)
+                step_break_flow = self.apply_targets(
+                    step, task.task_status, targets, task_done
                 )
             except Exception as e:
                 logger.exception(e)
-                current_step_break_flow = True
+                step_break_flow = True
+            finally:
+                self._new_task_logs += task.collect_log()
 
             # We want to toggle break_flow to True, but not back to False.
-            if current_step_break_flow:
-                break_flow = True
-
-        # If we have broken the flow, then we are done, any remaining tasks will
-        # be picked up next time.
-        if break_flow:
-            return None
+            break_flow = break_flow or step_break_flow
 
-        # Call this function again to execute the next steps.
-        self.execute_steps(user=user)
+        return break_flow, executed
 
     def execute_step(
         self,
@@ -111,9 +283,55 @@ class WorkflowExecutor:
         Execute the task for the given step.
 
         Generate any of the resulting tasks.
+
+        :returns (bool): Whether the flow should stop after this step.
         """
-        break_flow: bool = False
+        try:
+            break_flow, _ = self._execute_step(user=user, step=step)
+        finally:
+            if self._task_statuses is None:
+                self.save_pending_changes()
+
+        return break_flow
+
+    def _execute_step(
+        self,
+        user: User,
+        step: "Step",
+    ) -> Tuple[bool, bool]:
+        """
+        Execute the task for the given step.
+
+        :returns (tuple): Whether the flow should stop after this step, and
+            whether the task was executed (False for manual tasks).
+        """
+        task = self.get_task(user=user, step=step)
+
+        try:
+            # Check if this task is automatic or manual
+            if not task.auto:
+                return False, False
+
+            # Raises if user not authorised for step
+            self.check_authorised(user, step)
+
+            # Execute the task
+            targets, task_done = unpack_task_result(
+                task.task_status, task.execute(task.task_status.task_info)
+            )
+        finally:
+            # Save what the task logged with the wave, even if it raised.
+            self._new_task_logs += task.collect_log()
+
+        self.mark_executed(user=user, task_status=task.task_status, done=task_done)
+        self.save_executed(task)
+
+        return self.apply_targets(step, task.task_status, targets, task_done), True
 
+    def get_task(self, user: User, step: "Step") -> "Task":
+        """
+        Get the set up Task for the given step.
+        """
         task_status, _ = self.get_or_create_task_status(step=step)
 
         # Get the task for the current step
@@ -123,21 +341,41 @@ class WorkflowExecutor:
         # Setup the Task.
         task.setup(task_status.task_info)
 
-        # Check if this task is automatic or manual
-        if not task.auto:
-            return break_flow
-
-        # Raises if user not authorised for step
-        self.check_authorised(user, step)
+        return task
 
-        # Execute the task
-        targets, task_done = task.execute(task_status.task_info)
-
-        task_status.done = task_done
+    def mark_executed(self, user: User, task_status: TaskStatus, done: bool) -> None:
+        """
+        Record the execution of a task on its TaskStatus, without saving it.
+        """
+        task_status.done = done
         task_status.executed_by = user
         task_status.executed_at = timezone.now()
-        task_status.save()
 
+    def save_executed(self, task: "Task") -> None:
+        """
+        Queue up the executed TaskStatus of a task, and the emails the task
+        queued, to be saved together by `save_pending_changes`.
+        """
+        self._new_outbox_emails += task.collect_outbox_emails()
+        self._task_status_changed(task.task_status)
+
+    def _task_status_changed(self, task_status: TaskStatus) -> None:
+        # TaskStatuses that haven't been created yet are saved as they are.
+        if task_status.pk is not None:
+            self._changed_task_statuses[task_status.pk] = task_status
+
+    def apply_targets(
+        self,
+        step: "Step",
+        task_status: TaskStatus,
+        targets: Optional[Union[List[str], Literal["complete"]]],
+        task_done: bool,
+    ) -> bool:
+        """
+        Queue up the next steps after a task has been executed.
+
+        :returns (bool): Whether the flow should stop after this step.
+        """
         if targets is None:
             targets = []
 
@@ -150,47 +388,309 @@ class WorkflowExecutor:
                 # If the task is not done, then re-add the step to the targets.
                 targets.append(step.step_id)
 
+        workflow = self.flow.workflow
+
+        # A step that doesn't schedule every step it targets in the workflow can
+        # leave a join with fewer predecessors to wait for, unless it is run
+        # again and can still schedule them.
+        scheduled = [] if targets == COMPLETE else targets
+        if workflow.graph.joins and step.step_id not in scheduled:
+            unscheduled = set(workflow.graph.successors[step.step_id]) - set(scheduled)
+            self._branch_ended = self._branch_ended or bool(unscheduled)
+
         # Get/Create objects for the next tasks, generated after the current.
         if targets and targets != COMPLETE:
+            target_steps: List["Step"] = []
             for target in targets:
-                Target.objects.get_or_create(
-                    task_status=task_status, target_string=target
-                )
-                workflow_step = self.flow.workflow.get_step(step_id=target)
+                workflow_step = workflow.get_step(step_id=target)
                 if not workflow_step:
                     raise WorkflowError(f"Step '{target}' not found in workflow")
-                next_task_status, _ = self.get_or_create_task_status(step=workflow_step)
-                # Unset the executed fields so that the task will be picked up again.
-                next_task_status.executed_at = None
-                next_task_status.executed_by = None
-                next_task_status.save(
-                    update_fields=[
-                        "executed_at",
-                        "executed_by",
-                    ]
-                )
+                target_steps.append(workflow_step)
+
+            self._new_targets += [
+                Target(task_status=task_status, target_string=target)
+                for target in targets
+            ]
+
+            # Join barrier steps are scheduled by save_pending_changes, once
+            # every predecessor has arrived.
+            for target_step in target_steps:
+                if target_step.barrier:
+                    self._barrier_arrivals[target_step.step_id].add(step.step_id)
+            self.schedule_steps(
+                [target_step for target_step in target_steps if not target_step.barrier]
+            )
 
         # Break the flow if this task is the last in a loop or if the task isn't done or if this step is in the target list.
-        if (
-            self.flow.workflow.step_last_in_loop(step.step_id)
+        return (
+            workflow.step_last_in_loop(step.step_id)
             or not task_done
             or step.step_id in targets
+        )
+
+    def schedule_steps(self, steps: List["Step"]) -> None:
+        """
+        Queue up TaskStatuses for the given steps, so that they are executed
+        by the next wave.
+        """
+        for next_task_status in self.get_or_build_task_statuses(steps):
+            # Unset the executed fields so that the task will be picked up again.
+            next_task_status.executed_at = None
+            next_task_status.executed_by = None
+            self._task_status_changed(next_task_status)
+
+    def schedule_ready_joins(self) -> None:
+        """
+        Schedule the join barrier steps that every predecessor has arrived at.
+
+        Barriers are only looked at when something that can open them has
+        happened since the last time: a predecessor arrived, or a step didn't
+        schedule all of its targets, so that fewer predecessors can still run.
+        """
+        if self._barrier_arrivals or self._branch_ended:
+            self.schedule_steps(self.pass_join_barriers())
+        self._barrier_arrivals = defaultdict(set)
+        self._branch_ended = False
+
+    def pass_join_barriers(self) -> List["Step"]:
+        """
+        Record the pending arrivals at join barriers.
+
+        Arrivals are recorded by predecessor step id, so a predecessor that
+        arrives more than once (e.g. round a loop) is counted once. A join
+        doesn't wait for predecessors that can no longer run, those that can't
+        be reached from the flow's unexecuted steps without going through the
+        join, such as the branches a decision didn't take. The barrier is
+        deleted once the join is ready.
+
+        :returns (list[Step]): The join steps that are ready to be scheduled.
+        """
+        graph = self.flow.workflow.graph
+        open_barriers = JoinBarrier.objects.filter(flow=self.flow)
+        if not self._branch_ended:
+            # Only the joins that have been arrived at can have become ready.
+            open_barriers = open_barriers.filter(
+                step_id__in=list(self._barrier_arrivals)
+            )
+        barriers: Dict[str, JoinBarrier] = {
+            barrier.step_id: barrier for barrier in open_barriers
+        }
+        for step_id, arrived in self._barrier_arrivals.items():
+            barrier = barriers.setdefault(
+                step_id, JoinBarrier(flow=self.flow, step_id=step_id)
+            )
+            barrier.arrived = sorted(set(barrier.arrived) | arrived)
+
+        if not barriers:
+            return []
+
+        unexecuted_step_ids = self._get_unexecuted_step_ids()
+        ready_steps: List["Step"] = []
+
+        for step_id, barrier in barriers.items():
+            runnable = graph.reachable(unexecuted_step_ids, stop_at=step_id)
+            waiting = (set(graph.predecessors[step_id]) & runnable) - set(
+                barrier.arrived
+            )
+
+            if waiting:
+                if barrier.pk is None or step_id in self._barrier_arrivals:
+                    barrier.save()
+            else:
+                if barrier.pk is not None:
+                    barrier.delete()
+                ready_steps.append(graph.steps[step_id])
+
+        return ready_steps
+
+    def _get_unexecuted_step_ids(self) -> Set[str]:
+        """
+        Get the step ids of the flow's TaskStatuses that are waiting to be
+        executed, including the changes that haven't been saved yet.
+        """
+        if self._task_statuses is not None:
+            task_statuses = list(self._task_statuses.values())
+        else:
+            task_statuses = [
+                *self.flow.tasks.filter(executed_at__isnull=True).exclude(
+                    pk__in=list(self._changed_task_statuses)
+                ),
+                *self._changed_task_statuses.values(),
+                *self._new_task_statuses,
+            ]
+
+        return {
+            task_status.step_id
+            for task_status in task_statuses
+            if task_status.executed_at is None
+        }
+
+    def _renew_lease(self) -> None:
+        """
+        Extend the lease on the flow once half of it has been used up.
+        """
+        if self.flow.lease_owner != self.lease_owner:
+            return
+
+        assert self.flow.lease_expires_at
+
+        if self.flow.lease_expires_at - timezone.now() < get_lease_duration() / 2:
+            if not self.flow.acquire_lease(self.lease_owner):
+                self.discard_pending_changes()
+                raise WorkflowError("Lost the lease on the flow")
+
+    def save_pending_changes(self) -> None:
+        """
+        Save the changes of the executed steps.
+
+        New TaskStatuses are upserted, executed and reset TaskStatuses are bulk
+        updated, and Targets, TaskLogs and OutboxEmails are bulk inserted, all
+        in one transaction.
+
+        While this executor holds the lease on the flow, the transaction first
+        renews it with an UPDATE that only matches its own lease. If another
+        executor has taken the flow over the changes are discarded instead.
+
+        :raises (WorkflowError): If the lease on the flow has been lost.
+        """
+        if not (
+            self._barrier_arrivals
+            or self._branch_ended
+            or self._new_task_statuses
+            or self._changed_task_statuses
+            or self._new_targets
+            or self._new_task_logs
+            or self._new_outbox_emails
         ):
-            break_flow = True
+            return
 
-        return break_flow
+        with transaction.atomic():
+            if self.flow.lease_owner == self.lease_owner:
+                if not self.flow.renew_lease(self.lease_owner):
+                    self.discard_pending_changes()
+                    raise WorkflowError("Lost the lease on the flow")
+
+            # Joins are checked after each wave of execute_steps.
+            self.schedule_ready_joins()
+
+            if self._new_task_statuses:
+                upserted = bulk_create_task_statuses(self._new_task_statuses)
+                self._set_missing_pks(self._new_task_statuses)
+                if not upserted:
+                    # Rows created in the meantime were left as they were.
+                    TaskStatus.objects.bulk_update(
+                        self._new_task_statuses, fields=RETARGETED_FIELDS
+                    )
+
+            if self._changed_task_statuses:
+                TaskStatus.objects.bulk_update(
+                    self._changed_task_statuses.values(), fields=EXECUTED_FIELDS
+                )
+
+            if self._new_targets:
+                Target.objects.bulk_create(self._new_targets, ignore_conflicts=True)
+
+            if self._new_task_logs:
+                TaskLog.objects.bulk_create(self._new_task_logs)
+
+            if self._new_outbox_emails:
+                OutboxEmail.objects.bulk_create(self._new_outbox_emails)
+
+        self.discard_pending_changes()
+
+    def discard_pending_changes(self) -> None:
+        """
+        Forget the changes of the executed steps, once they have been saved or
+        when they mustn't be.
+        """
+        self._barrier_arrivals = defaultdict(set)
+        self._branch_ended = False
+        self._new_task_statuses = []
+        self._changed_task_statuses = {}
+        self._new_targets = []
+        self._new_task_logs = []
+        self._new_outbox_emails = []
+
+    def _set_missing_pks(self, task_statuses: List[TaskStatus]) -> None:
+        """
+        Fetch the primary keys of bulk created TaskStatuses, for databases that
+        can't return them from a bulk insert.
+        """
+        if all(task_status.pk for task_status in task_statuses):
+            return
+
+        pks = dict(
+            self.flow.tasks.filter(
+                step_id__in=[task_status.step_id for task_status in task_statuses]
+            )
+            .order_by("pk")
+            .values_list("step_id", "pk")
+        )
+        for task_status in task_statuses:
+            task_status.pk = pks[task_status.step_id]
+
+    def get_or_build_task_statuses(self, steps: List["Step"]) -> List[TaskStatus]:
+        """
+        Get or build the TaskStatuses for the given Steps.
+
+        TaskStatuses that don't exist yet are built but not saved, they are
+        created by the next `save_pending_changes`.
+        """
+        if self._task_statuses is not None:
+            task_statuses = self._task_statuses
+        else:
+            task_statuses = {
+                task_status.step_id: task_status
+                for task_status in self.flow.tasks.filter(
+                    step_id__in=[step.step_id for step in steps]
+                ).order_by("-pk")
+            }
+
+        step_task_statuses: List[TaskStatus] = []
+        for step in steps:
+            task_status = task_statuses.get(step.step_id)
+            if task_status:
+                if retarget_task_status(task_status, step) and task_status.pk:
+                    task_status.save(update_fields=RETARGETED_FIELDS)
+            else:
+                task_status = TaskStatus(
+                    flow=self.flow,
+                    task_name=step.task_name,
+                    step_id=step.step_id,
+                    task_info=step.task_info or {},
+                )
+                task_statuses[step.step_id] = task_status
+                self._new_task_statuses.append(task_status)
+            step_task_statuses.append(task_status)
+
+        return step_task_statuses
 
     def get_or_create_task_status(self, step: "Step") -> Tuple[TaskStatus, bool]:
         """
         Get or create a TaskStatus for a given Step.
         """
+        task_status: Optional[TaskStatus] = None
+        if self._task_statuses is not None:
+            task_status = self._task_statuses.get(step.step_id)
+
+        if task_status:
+            created = False
+        else:
+            task_status, created = TaskStatus.objects.get_or_create(
+                flow=self.flow,
+                step_id=step.step_id,
+                defaults={
+                    "task_name": step.task_name,
+                    "task_info": step.task_info or {},
+                },
+            )
+
+        if retarget_task_status(task_status, step):
+            task_status.save(update_fields=RETARGETED_FIELDS)
+
+        if self._task_statuses is not None:
+            self._task_statuses.setdefault(step.step_id, task_status)
 
-        task_status, created = TaskStatus.objects.get_or_create(
-            flow=self.flow,
-            task_name=step.task_name,
-            step_id=step.step_id,
-            defaults={"task_info": step.task_info or {}},
-        )
         return task_status, created
 
     def get_current_steps(self) -> List["Step"]:
@@ -199,10 +699,39 @@ class WorkflowExecutor:
         """
 
         current_steps: List["Step"] = []
+        workflow = self.flow.workflow
 
         # Get all TaskRecords that haven't been executed yet.
-        for task in self.flow.tasks.filter(executed_at__isnull=True):
-            step = self.flow.workflow.get_step(task.step_id)
+        for task in self.flow.tasks.filter(executed_at__isnull=True).order_by("pk"):
+            step = workflow.get_step(task.step_id)
+            if step:
+                current_steps.append(step)
+
+        return current_steps
+
+    def _get_frontier(self) -> List["Step"]:
+        """
+        Get the current steps that are due from the TaskStatuses held in memory.
+        """
+        assert self._task_statuses is not None
+
+        workflow = self.flow.workflow
+        now = timezone.now()
+        # TaskStatuses that haven't been created yet come last, in the order
+        # they were built.
+        unexecuted_task_statuses = sorted(
+            (
+                task_status
+                for task_status in self._task_statuses.values()
+                if task_status.executed_at is None
+                and (task_status.run_after is None or task_status.run_after <= now)
+            ),
+            key=lambda task_status: (task_status.pk is None, task_status.pk or 0),
+        )
+
+        current_steps: List["Step"] = []
+        for task_status in unexecuted_task_statuses:
+            step = workflow.get_step(task_status.step_id)
             if step:
                 current_steps.append(step)
 
@@ -226,3 +755,91 @@ class WorkflowExecutor:
             return
         msg = f"User '{user}' is not authorised to execute the step: {step.task_name}"
         raise WorkflowNotAuthError(msg)
+
+
+def wave_needs_saving(
+    previous_steps: List["Step"], current_steps: List["Step"]
+) -> bool:
+    """
+    Whether the changes of the previous waves must be saved before the current
+    wave runs, which is unless the tasks of both waves set
+    `reads_task_statuses` to False.
+    """
+    return any(
+        step.task.reads_task_statuses for step in [*previous_steps, *current_steps]
+    )
+
+
+def bulk_create_task_statuses(task_statuses: List[TaskStatus]) -> bool:
+    """
+    Insert TaskStatuses, overwriting the existing TaskStatus of a step instead
+    when one has been created in the meantime (e.g. by another worker).
+
+    This is a single `INSERT ... ON CONFLICT` statement on databases that
+    support it (Django 4.1 or later), which sets every field the executor
+    may have changed. Otherwise rows that already exist are left alone.
+    Either way the primary keys may not be set afterwards.
+
+    :returns (bool): Whether existing rows were overwritten.
+    """
+    if getattr(connection.features, "supports_update_conflicts_with_target", False):
+        TaskStatus.objects.bulk_create(
+            task_statuses,
+            update_conflicts=True,
+            unique_fields=["flow", "step_id"],
+            update_fields=RETARGETED_FIELDS,
+        )
+        return True
+
+    TaskStatus.objects.bulk_create(task_statuses, ignore_conflicts=True)
+    return False
+
+
+def unpack_task_result(
+    task_status: TaskStatus, result: "TaskResult"
+) -> Tuple[Optional[Union[List[str], Literal["complete"]]], bool]:
+    """
+    Get the targets and whether the task is done from what a task returned.
+
+    A task that returned `RunAfter` isn't done and targets its own step again,
+    with its TaskStatus scheduled for when it is due, without saving it.
+    """
+    if isinstance(result, RunAfter):
+        task_status.run_after = result.when
+        return [], False
+
+    task_status.run_after = None
+    return result
+
+
+def retarget_task_status(task_status: TaskStatus, step: "Step") -> bool:
+    """
+    Point a TaskStatus at the task of its step, if the step's task has changed
+    since the TaskStatus was created, without saving it.
+
+    A flow has one TaskStatus per step, so it is reset for the new task rather
+    than a second TaskStatus being created.
+
+    :returns (bool): Whether the TaskStatus was changed.
+    """
+    if task_status.task_name == step.task_name:
+        return False
+
+    task_status.task_name = step.task_name
+    task_status.task_info = step.task_info or {}
+    task_status.done = False
+    task_status.executed_at = None
+    task_status.executed_by = None
+    task_status.run_after = None
+    return True
+
+
+def execute_task_in_thread(task: "Task") -> "TaskResult":
+    """
+    Execute a task in a thread pool, closing the thread's database connection
+    once it is done.
+    """
+    try:
+        return task.execute(task.task_status.task_info)
+    finally:
+        connection.close()
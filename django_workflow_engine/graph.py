@@ -0,0 +1,273 @@
+"""django_workflow_engine compiled workflow graph.
+
+A `WorkflowGraph` is an immutable, pre-indexed view of a `Workflow` definition.
+It is built once per workflow and answers the lookups the executor, views and
+built-in tasks need (step by id, successors, predecessors, loop membership)
+without walking the list of steps.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from django_workflow_engine.exceptions import WorkflowImproperlyConfigured
+
+if TYPE_CHECKING:
+    from django_workflow_engine.dataclass import Step, Workflow
+
+
+@dataclass(frozen=True)
+class WorkflowGraph:
+    """Compiled representation of a workflow.
+
+    Attributes:
+        steps: Mapping of step id to step.
+        successors: Mapping of step id to the step ids it targets.
+        predecessors: Mapping of step id to the step ids that target it.
+        start_step: The step flagged with `start=True`, if any.
+        loops: The loops found in the workflow, each a tuple of step ids.
+        last_in_loop: Step ids that are the last step of a loop.
+        joins: Step ids of the join barrier steps, see `Step.barrier`.
+    """
+
+    steps: Mapping[str, "Step"]
+    successors: Mapping[str, Tuple[str, ...]]
+    predecessors: Mapping[str, Tuple[str, ...]]
+    start_step: Optional["Step"]
+    loops: Tuple[Tuple[str, ...], ...]
+    last_in_loop: FrozenSet[str]
+    joins: FrozenSet[str]
+
+    @classmethod
+    def compile(cls, workflow: "Workflow") -> "WorkflowGraph":
+        steps: Dict[str, "Step"] = {}
+        start_step: Optional["Step"] = None
+
+        for step in workflow.steps:
+            # The first definition of a step id wins, as it always has.
+            steps.setdefault(step.step_id, step)
+            if start_step is None and step.start:
+                start_step = step
+
+        successors: Dict[str, Tuple[str, ...]] = {}
+        predecessors: Dict[str, List[str]] = {step_id: [] for step_id in steps}
+
+        for step_id, step in steps.items():
+            if step.targets == "complete":
+                successors[step_id] = ()
+                continue
+
+            successors[step_id] = tuple(target for target in step.targets if target)
+            for target in successors[step_id]:
+                if target in predecessors and step_id not in predecessors[target]:
+                    predecessors[target].append(step_id)
+
+        loops = find_loops(steps, successors, start_step)
+
+        return cls(
+            steps=MappingProxyType(steps),
+            successors=MappingProxyType(successors),
+            predecessors=MappingProxyType(
+                {step_id: tuple(ids) for step_id, ids in predecessors.items()}
+            ),
+            start_step=start_step,
+            loops=loops,
+            last_in_loop=frozenset(loop[-1] for loop in loops),
+            joins=frozenset(step_id for step_id, step in steps.items() if step.barrier),
+        )
+
+    def get_step(self, step_id: str) -> Optional["Step"]:
+        return self.steps.get(step_id)
+
+    def reachable(self, step_ids: Iterable[str], stop_at: str) -> Set[str]:
+        """The step ids that can be reached from the given steps, including
+        them, without going through the `stop_at` step."""
+        reached: Set[str] = set()
+        stack: List[str] = [step_id for step_id in step_ids if step_id in self.steps]
+
+        while stack:
+            step_id = stack.pop()
+            if step_id in reached or step_id == stop_at:
+                continue
+            reached.add(step_id)
+            stack.extend(
+                target for target in self.successors[step_id] if target in self.steps
+            )
+
+        return reached
+
+    @property
+    def first_step(self) -> "Step":
+        if self.start_step is None:
+            raise WorkflowImproperlyConfigured("Workflow has no start step")
+        return self.start_step
+
+
+def find_loops(
+    steps: Mapping[str, "Step"],
+    successors: Mapping[str, Tuple[str, ...]],
+    start_step: Optional["Step"],
+) -> Tuple[Tuple[str, ...], ...]:
+    """Find the loops in a workflow.
+
+    Steps are grouped into strongly connected components, only components that
+    contain a cycle can hold a loop. Walking depth first from the start step,
+    every edge that enters such a component starts a depth first search
+    restricted to that component, and each back edge it finds closes a loop.
+
+    A loop is the run of step ids from the step jumped back to, up to the step
+    that jumps back, so the last step id of a loop is the step that sends the
+    flow round again. Loops are returned once each, in the order they are
+    reached from the start step, and steps that can't be reached from the
+    start step are ignored.
+    """
+    if start_step is None:
+        return ()
+
+    adjacency: Dict[str, Tuple[str, ...]] = {
+        step_id: tuple(target for target in successors[step_id] if target in steps)
+        for step_id in steps
+    }
+    component_of = strongly_connected_components(adjacency)
+    cyclic_components = {
+        component_of[step_id]
+        for step_id, targets in adjacency.items()
+        for target in targets
+        if component_of[step_id] == component_of[target]
+    }
+
+    loops: List[Tuple[str, ...]] = []
+    found: Set[Tuple[str, ...]] = set()
+    entered: Set[str] = set()
+
+    def enter_component(entry: str) -> None:
+        if entry in entered or component_of[entry] not in cyclic_components:
+            return
+        entered.add(entry)
+
+        for loop in _back_edge_loops(adjacency, component_of, entry):
+            if loop not in found:
+                found.add(loop)
+                loops.append(loop)
+
+    start_step_id = start_step.step_id
+    enter_component(start_step_id)
+
+    visited: Set[str] = {start_step_id}
+    stack: List[Tuple[str, Iterator[str]]] = [
+        (start_step_id, iter(adjacency[start_step_id]))
+    ]
+
+    while stack:
+        step_id, targets = stack[-1]
+        for target in targets:
+            if component_of[target] != component_of[step_id]:
+                enter_component(target)
+            if target not in visited:
+                visited.add(target)
+                stack.append((target, iter(adjacency[target])))
+                break
+        else:
+            stack.pop()
+
+    return tuple(loops)
+
+
+def _back_edge_loops(
+    adjacency: Mapping[str, Tuple[str, ...]],
+    component_of: Mapping[str, int],
+    entry: str,
+) -> List[Tuple[str, ...]]:
+    """Find the loops closed by back edges within the component of `entry`."""
+    component = component_of[entry]
+    loops: List[Tuple[str, ...]] = []
+
+    path: List[str] = [entry]
+    path_index: Dict[str, int] = {entry: 0}
+    visited: Set[str] = {entry}
+    stack: List[Iterator[str]] = [iter(adjacency[entry])]
+
+    while stack:
+        for target in stack[-1]:
+            if component_of[target] != component:
+                continue
+            if target in path_index:
+                loops.append(tuple(path[path_index[target] :]))
+            elif target not in visited:
+                visited.add(target)
+                path_index[target] = len(path)
+                path.append(target)
+                stack.append(iter(adjacency[target]))
+                break
+        else:
+            stack.pop()
+            del path_index[path.pop()]
+
+    return loops
+
+
+def strongly_connected_components(
+    adjacency: Mapping[str, Tuple[str, ...]]
+) -> Dict[str, int]:
+    """Label each step with the strongly connected component it belongs to.
+
+    An iterative version of Tarjan's algorithm, so long workflows don't run
+    into the recursion limit.
+
+    :param (Mapping) adjacency: Step id to the step ids it targets, every
+        target must also be a key.
+    :returns (dict): Step id to component number.
+    """
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    component_of: Dict[str, int] = {}
+    component_stack: List[str] = []
+    on_component_stack: Set[str] = set()
+    component_count = 0
+
+    for root in adjacency:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        component_stack.append(root)
+        on_component_stack.add(root)
+        stack: List[Tuple[str, Iterator[str]]] = [(root, iter(adjacency[root]))]
+
+        while stack:
+            step_id, targets = stack[-1]
+            for target in targets:
+                if target not in index:
+                    index[target] = lowlink[target] = len(index)
+                    component_stack.append(target)
+                    on_component_stack.add(target)
+                    stack.append((target, iter(adjacency[target])))
+                    break
+                if target in on_component_stack:
+                    lowlink[step_id] = min(lowlink[step_id], index[target])
+            else:
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[step_id])
+
+                if lowlink[step_id] == index[step_id]:
+                    while True:
+                        member = component_stack.pop()
+                        on_component_stack.discard(member)
+                        component_of[member] = component_count
+                        if member == step_id:
+                            break
+                    component_count += 1
+
+    return component_of
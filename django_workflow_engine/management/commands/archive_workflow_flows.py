@@ -0,0 +1,60 @@
+import gzip
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from django_workflow_engine.archive import archivable_flows, archive_flows
+
+
+class Command(BaseCommand):
+    help = "Archive finished flows to a gzipped JSON lines file and delete them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Archive flows that finished more than this many days ago.",
+        )
+        parser.add_argument(
+            "--output",
+            help=(
+                "File to write the archived flows to, defaults to "
+                "workflow-flows-<timestamp>.jsonl.gz."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of flows to archive per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the number of flows to archive without archiving them.",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timedelta(days=options["days"])
+
+        if options["dry_run"]:
+            count = archivable_flows(older_than).count()
+            self.stdout.write(f"{count} flows would be archived.")
+            return
+
+        output = options["output"] or (
+            f"workflow-flows-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz"
+        )
+        self.stdout.write(f"Archiving flows to {output}...")
+
+        archived = 0
+        with gzip.open(output, "at", encoding="utf-8") as file:
+            for batch_count in archive_flows(
+                file, older_than, batch_size=options["batch_size"]
+            ):
+                archived += batch_count
+                self.stdout.write(f"Archived {archived} flows")
+
+        self.stdout.write("Done.")
@@ -1,24 +1,109 @@
+import time
+from typing import List, Type
+
+from django.apps.registry import Apps
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Min, Model
 
-from django_workflow_engine.models import Flow
+# The migration that removes the duplicate TaskRecords, before the unique
+# constraint on (flow, step_id) is added.
+DEDUPE_MIGRATION = ("django_workflow_engine", "0014_dedupe_task_statuses")
 
 
 class Command(BaseCommand):
-    help = "Clean up duplicate TaskRecords"
+    help = (
+        "Clean up duplicate TaskRecords. Run once before migrating to "
+        "0014_dedupe_task_statuses, to keep the first TaskRecord of a step "
+        "rather than the latest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of flows to clean up per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the duplicate TaskRecords without deleting them.",
+        )
 
     def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+        dry_run: bool = options["dry_run"]
+
+        loader = MigrationLoader(connection)
+        if DEDUPE_MIGRATION in loader.applied_migrations:
+            self.stdout.write(
+                "Migration 0014_dedupe_task_statuses has removed the duplicate "
+                "TaskRecords, there is nothing to clean up."
+            )
+            return
+
+        # The tables are as the applied migrations left them, not as the
+        # current models describe them.
+        apps: Apps = loader.project_state(list(loader.applied_migrations)).apps
+        Flow = apps.get_model("django_workflow_engine", "Flow")
+        TaskStatus = apps.get_model("django_workflow_engine", "TaskStatus")
+
         self.stdout.write("Cleaning up duplicate TaskRecords...")
-        unfinished_flows = Flow.objects.filter(finished__isnull=True)
-        for flow in unfinished_flows:
-            unexecuted_tasks = flow.tasks.filter(executed_at__isnull=True)
-            steps_running = []
-            for task in unexecuted_tasks:
-                if task.step_id in steps_running:
-                    task.delete()
-                    self.stdout.write(
-                        "Deleted duplicate TaskRecord for Flow "
-                        f"{flow.pk} and step {task.step_id}"
-                    )
+
+        started = time.monotonic()
+        flow_count = 0
+        duplicate_count = 0
+        last_pk = 0
+
+        while True:
+            flow_pks: List[int] = list(
+                Flow.objects.filter(finished__isnull=True, pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not flow_pks:
+                break
+
+            with transaction.atomic():
+                duplicates = get_duplicate_task_statuses(TaskStatus, flow_pks)
+                if dry_run:
+                    duplicate_count += duplicates.count()
                 else:
-                    steps_running.append(task.step_id)
+                    duplicate_count += duplicates.delete()[1].get(
+                        TaskStatus._meta.label, 0
+                    )
+
+            flow_count += len(flow_pks)
+            last_pk = flow_pks[-1]
+
+            elapsed = time.monotonic() - started
+            throughput = flow_count / elapsed if elapsed else flow_count
+            self.stdout.write(
+                f"Checked {flow_count} flows, "
+                f"{'found' if dry_run else 'deleted'} {duplicate_count} "
+                f"duplicate TaskRecords ({throughput:.0f} flows/s)"
+            )
+
         self.stdout.write("Done.")
+
+
+def get_duplicate_task_statuses(TaskStatus: Type[Model], flow_pks: List[int]):
+    """Get the unexecuted TaskStatuses of a step that aren't the first of it.
+
+    :param (type) TaskStatus: The TaskStatus model of the applied migrations.
+    :param (list[int]) flow_pks: The flows to look for duplicates in.
+    :returns (QuerySet): The duplicate TaskStatuses.
+    """
+    unexecuted_task_statuses = TaskStatus._default_manager.filter(
+        flow_id__in=flow_pks, executed_at__isnull=True
+    )
+    first_task_status_pks = (
+        unexecuted_task_statuses.values("flow_id", "step_id")
+        .annotate(first_pk=Min("pk"))
+        .values("first_pk")
+        .order_by()
+    )
+
+    return unexecuted_task_statuses.exclude(pk__in=first_task_status_pks)
@@ -0,0 +1,75 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from django_workflow_engine.outbox import DEFAULT_MAX_ATTEMPTS, deliver_outbox
+
+
+class Command(BaseCommand):
+    help = "Send the emails queued in the workflow email outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Maximum number of emails to send over one connection.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=DEFAULT_MAX_ATTEMPTS,
+            help="Number of times an email is tried before giving up on it.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait before polling again when there is no work.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the emails that are due and exit.",
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+
+        previous_handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+
+        self.stdout.write("Delivering workflow emails...")
+
+        try:
+            self.run(options)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write("Done.")
+
+    def run(self, options) -> None:
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            result = deliver_outbox(options["batch_size"], options["max_attempts"])
+
+            if result.sent or result.failed:
+                self.stdout.write(
+                    f"Sent {result.sent} emails, {result.failed} failed, in "
+                    f"{time.monotonic() - started:.2f} seconds"
+                )
+                continue
+
+            if options["once"]:
+                break
+
+            self.stopping.wait(options["interval"])
+
+    def stop(self, signum, frame) -> None:
+        self.stdout.write("Stopping after the current batch...")
+        self.stopping.set()
@@ -0,0 +1,56 @@
+import gzip
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from django_workflow_engine.archive import (
+    export_legacy_task_records,
+    legacy_task_records_exist,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the legacy TaskRecordExecutions to a gzipped JSON lines file, "
+        "before migration 0016 drops their tables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help=(
+                "File to write the task records to, defaults to "
+                "legacy-task-records-<timestamp>.jsonl.gz."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of task records to export per transaction.",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete the task records once they have been exported.",
+        )
+
+    def handle(self, *args, **options):
+        if not legacy_task_records_exist():
+            self.stdout.write("The legacy task record tables have been removed.")
+            return
+
+        output = options["output"] or (
+            f"legacy-task-records-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz"
+        )
+        self.stdout.write(f"Exporting legacy task records to {output}...")
+
+        exported = 0
+        with gzip.open(output, "at", encoding="utf-8") as file:
+            for batch_count in export_legacy_task_records(
+                file, batch_size=options["batch_size"], delete=options["delete"]
+            ):
+                exported += batch_count
+                self.stdout.write(f"Exported {exported} task records")
+
+        self.stdout.write("Done.")
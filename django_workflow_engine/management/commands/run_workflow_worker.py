@@ -0,0 +1,115 @@
+import signal
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from django_workflow_engine.worker import (
+    claim_runnable_flows,
+    generate_worker_id,
+    init_worker_process,
+    release_claimed_flows,
+    run_claimed_flow,
+)
+
+
+class Command(BaseCommand):
+    help = "Run flows that have automatic steps waiting to be executed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of flows to run in parallel.",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default="thread",
+            help="Run flows in a thread pool or a process pool.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Maximum number of flows to claim at a time.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait before polling again when there is no work.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run one batch of flows and exit.",
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        worker_id = generate_worker_id()
+
+        previous_handlers = {
+            signum: signal.signal(signum, self.stop)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+
+        self.stdout.write(f"Starting workflow worker {worker_id}...")
+
+        try:
+            with self.get_pool(options["pool"], options["workers"]) as pool:
+                self.run(pool, worker_id, options)
+        finally:
+            release_claimed_flows(worker_id)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write("Done.")
+
+    def get_pool(self, pool: str, workers: int) -> Executor:
+        if pool == "process":
+            # Each process closes the connections it inherits, see
+            # init_worker_process.
+            return ProcessPoolExecutor(
+                max_workers=workers, initializer=init_worker_process
+            )
+        return ThreadPoolExecutor(max_workers=workers)
+
+    def run(self, pool: Executor, worker_id: str, options) -> None:
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            flow_pks = claim_runnable_flows(worker_id, options["batch_size"])
+
+            progressed = False
+            if flow_pks:
+                if isinstance(pool, ProcessPoolExecutor):
+                    # Processes are forked as flows are submitted, don't let
+                    # them inherit the connection the claim was made on.
+                    connections.close_all()
+                futures = [
+                    pool.submit(run_claimed_flow, flow_pk, worker_id)
+                    for flow_pk in flow_pks
+                ]
+                # Let the batch finish, even when stopping.
+                wait(futures)
+                progressed = any(future.result() for future in futures)
+                self.stdout.write(
+                    f"Ran {len(flow_pks)} flows in "
+                    f"{time.monotonic() - started:.2f} seconds"
+                )
+
+            if options["once"]:
+                break
+
+            # Wait when there was no work, or when the flows were only polling
+            # steps that weren't done, rather than claiming them straight away.
+            if not progressed:
+                self.stopping.wait(options["interval"])
+
+    def stop(self, signum, frame) -> None:
+        self.stdout.write("Stopping after the current batch...")
+        self.stopping.set()
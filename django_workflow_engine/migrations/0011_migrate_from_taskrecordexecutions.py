@@ -1,11 +1,37 @@
 # Generated by Django 4.1.3 on 2023-03-08 15:25
+from typing import Dict, List, Set, Tuple
+
 from django.db import migrations
+from django.db.models import OuterRef, Subquery
 
 from django_workflow_engine.utils import lookup_workflow
 
+# The number of flows migrated at a time, and rows inserted per INSERT.
+BATCH_SIZE = 1000
+
 
 def migrate_from_taskrecordexecutions(apps, schema_editor):
+    """Copy the latest TaskRecordExecution of each step of each flow to a
+    TaskStatus, with its Targets and TaskLogs.
+
+    Flows are migrated in batches, the number of queries per batch doesn't
+    depend on the number of steps, executions, targets or logs.
+    """
     Flow = apps.get_model("django_workflow_engine", "Flow")
+    flows = Flow.objects.order_by("pk").values_list("pk", "workflow_name")
+
+    batch: List[Tuple[int, str]] = []
+    for flow in flows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(flow)
+        if len(batch) == BATCH_SIZE:
+            migrate_flows(apps, batch)
+            batch = []
+
+    if batch:
+        migrate_flows(apps, batch)
+
+
+def migrate_flows(apps, flows: List[Tuple[int, str]]) -> None:
     TaskStatus = apps.get_model("django_workflow_engine", "TaskStatus")
     Target = apps.get_model("django_workflow_engine", "Target")
     TaskLog = apps.get_model("django_workflow_engine", "TaskLog")
@@ -19,49 +45,97 @@ def migrate_from_taskrecordexecutions(apps, schema_editor):
         "django_workflow_engine", "TaskRecordExecutionTaskLog"
     )
 
-    for flow in Flow.objects.all():
-        workflow = lookup_workflow(flow.workflow_name)
-        # For each step in the flow, get the most recent TaskRecordExecution
-        # and create a new TaskStatus
-        for step in workflow.steps:
-            # Get the most recent TaskRecordExecution for this step
-            task_execution = (
-                TaskRecordExecution.objects.filter(flow=flow, step_id=step.step_id)
-                .order_by("-started_at")
-                .first()
-            )
-            if not task_execution:
-                continue
+    # Only the steps that are still in the flow's workflow are migrated.
+    workflow_step_ids: Dict[str, Set[str]] = {}
+    flow_step_ids: Dict[int, Set[str]] = {}
+    for flow_pk, workflow_name in flows:
+        if workflow_name not in workflow_step_ids:
+            workflow = lookup_workflow(workflow_name)
+            workflow_step_ids[workflow_name] = {step.step_id for step in workflow.steps}
+        flow_step_ids[flow_pk] = workflow_step_ids[workflow_name]
 
-            task_status = TaskStatus.objects.create(
-                flow=flow,
-                step_id=step.step_id,
-                started_at=task_execution.started_at,
-                executed_at=task_execution.executed_at,
-                executed_by=task_execution.executed_by,
+    # The most recent TaskRecordExecution of each step of each flow.
+    latest_executions = TaskRecordExecution.objects.filter(
+        flow_id=OuterRef("flow_id"), step_id=OuterRef("step_id")
+    ).order_by("-started_at", "-pk")
+    task_executions = [
+        task_execution
+        for task_execution in TaskRecordExecution.objects.filter(
+            flow_id__in=flow_step_ids,
+            pk=Subquery(latest_executions.values("pk")[:1]),
+        ).order_by("pk")
+        if task_execution.step_id in flow_step_ids[task_execution.flow_id]
+    ]
+    if not task_executions:
+        return
+
+    task_statuses = TaskStatus.objects.bulk_create(
+        [
+            TaskStatus(
+                flow_id=task_execution.flow_id,
+                step_id=task_execution.step_id,
                 task_name=task_execution.task_name,
                 task_info=task_execution.task_info,
+                executed_at=task_execution.executed_at,
+                executed_by_id=task_execution.executed_by_id,
                 done=task_execution.done,
             )
+            for task_execution in task_executions
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    # Databases that can't return the primary keys of inserted rows.
+    if not all(task_status.pk for task_status in task_statuses):
+        pks = {
+            (flow_id, step_id): pk
+            for pk, flow_id, step_id in TaskStatus.objects.filter(
+                flow_id__in=flow_step_ids
+            ).values_list("pk", "flow_id", "step_id")
+        }
+        for task_status in task_statuses:
+            task_status.pk = pks[(task_status.flow_id, task_status.step_id)]
 
-            # Create a new Target for each Target in the TaskRecordExecution
-            for target in TaskRecordExecutionTarget.objects.filter(
-                task_record=task_execution
-            ):
-                Target.objects.create(
-                    target_string=target.target_string,
-                    task_status=task_status,
+    task_status_pks: Dict[int, int] = {
+        task_execution.pk: task_status.pk
+        for task_execution, task_status in zip(task_executions, task_statuses)
+    }
+
+    Target.objects.bulk_create(
+        [
+            Target(
+                target_string=target_string,
+                task_status_id=task_status_pks[task_record_id],
+            )
+            for target_string, task_record_id in (
+                TaskRecordExecutionTarget.objects.filter(
+                    task_record_id__in=task_status_pks
                 )
+                .order_by("pk")
+                .values_list("target_string", "task_record_id")
+                .iterator(chunk_size=BATCH_SIZE)
+            )
+        ],
+        batch_size=BATCH_SIZE,
+    )
 
-            # Create a new TaskLog for each TaskLog in the TaskRecordExecution
-            for task_log in TaskRecordExecutionTaskLog.objects.filter(
-                task_record=task_execution
-            ):
-                TaskLog.objects.create(
-                    logged_at=task_log.logged_at,
-                    message=task_log.message,
-                    task_status=task_log.task_status,
+    TaskLog.objects.bulk_create(
+        [
+            TaskLog(
+                message=message,
+                task_status_id=task_status_pks[task_record_id],
+            )
+            for message, task_record_id in (
+                TaskRecordExecutionTaskLog.objects.filter(
+                    task_record_id__in=task_status_pks
                 )
+                .order_by("pk")
+                .values_list("message", "task_record_id")
+                .iterator(chunk_size=BATCH_SIZE)
+            )
+        ],
+        batch_size=BATCH_SIZE,
+    )
 
 
 class Migration(migrations.Migration):
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_workflow_engine", "0012_alter_target_unique_together"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="flow",
+            name="running",
+        ),
+        migrations.AddField(
+            model_name="flow",
+            name="lease_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="flow",
+            name="lease_owner",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:09
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def dedupe_task_statuses(apps, schema_editor):
+    """Keep the latest TaskStatus of each step of a flow.
+
+    A flow should only have one TaskStatus per step, but duplicates could be
+    created when a step's task was changed. The logs of the older TaskStatuses
+    are moved to the latest one before they are deleted.
+    """
+    TaskStatus = apps.get_model("django_workflow_engine", "TaskStatus")
+    TaskLog = apps.get_model("django_workflow_engine", "TaskLog")
+
+    duplicates = (
+        TaskStatus.objects.values("flow_id", "step_id")
+        .annotate(latest_pk=Max("pk"), count=Count("pk"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+
+    for duplicate in duplicates.iterator():
+        older_task_statuses = TaskStatus.objects.filter(
+            flow_id=duplicate["flow_id"],
+            step_id=duplicate["step_id"],
+            pk__lt=duplicate["latest_pk"],
+        )
+        TaskLog.objects.filter(task_status__in=older_task_statuses).update(
+            task_status_id=duplicate["latest_pk"]
+        )
+        older_task_statuses.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_workflow_engine", "0013_flow_lease"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=dedupe_task_statuses,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
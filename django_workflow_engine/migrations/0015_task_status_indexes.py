@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_workflow_engine", "0014_dedupe_task_statuses"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flow",
+            index=models.Index(fields=["-started"], name="flow_started_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="flow",
+            index=models.Index(
+                condition=models.Q(("finished__isnull", True)),
+                fields=["id"],
+                name="flow_unfinished_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskstatus",
+            index=models.Index(
+                fields=["flow", "step_id", "done"], name="task_status_step_done_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskstatus",
+            index=models.Index(
+                condition=models.Q(("executed_at__isnull", True)),
+                fields=["flow"],
+                name="task_status_unexecuted_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="taskstatus",
+            constraint=models.UniqueConstraint(
+                fields=("flow", "step_id"), name="unique_task_status_step"
+            ),
+        ),
+    ]
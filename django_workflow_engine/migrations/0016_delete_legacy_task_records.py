@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:14
+
+from django.conf import settings
+from django.db import migrations
+
+from django_workflow_engine.exceptions import WorkflowImproperlyConfigured
+
+
+def check_legacy_task_records_exported(apps, schema_editor):
+    """Refuse to drop TaskRecordExecutions that haven't been exported, unless
+    `DJANGO_WORKFLOW_DROP_LEGACY_TASK_RECORDS` is set."""
+    if getattr(settings, "DJANGO_WORKFLOW_DROP_LEGACY_TASK_RECORDS", False):
+        return
+
+    TaskRecordExecution = apps.get_model(
+        "django_workflow_engine", "TaskRecordExecution"
+    )
+    if TaskRecordExecution.objects.using(schema_editor.connection.alias).exists():
+        raise WorkflowImproperlyConfigured(
+            "Migration 0016 drops the legacy TaskRecordExecution tables, which "
+            "still have rows. Run `manage.py export_legacy_task_records "
+            "--delete` first, or set DJANGO_WORKFLOW_DROP_LEGACY_TASK_RECORDS "
+            "= True to drop them without exporting them."
+        )
+
+
+class Migration(migrations.Migration):
+    """Drop the legacy TaskRecordExecution tables.
+
+    Export their rows first with the `export_legacy_task_records` command, the
+    migration refuses to run while the tables have rows unless
+    `DJANGO_WORKFLOW_DROP_LEGACY_TASK_RECORDS` is set. The tables are dropped
+    child first, rather than having their foreign keys removed, so no table
+    is rewritten.
+    """
+
+    dependencies = [
+        ("django_workflow_engine", "0015_task_status_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            check_legacy_task_records_exported, migrations.RunPython.noop
+        ),
+        migrations.DeleteModel(
+            name="TaskRecordExecutionTaskLog",
+        ),
+        migrations.DeleteModel(
+            name="TaskRecordExecutionTarget",
+        ),
+        migrations.DeleteModel(
+            name="TaskRecordExecution",
+        ),
+    ]
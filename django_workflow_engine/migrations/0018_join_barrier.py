@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_workflow_engine", "0017_outboxemail"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JoinBarrier",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("step_id", models.CharField(max_length=100)),
+                ("remaining", models.IntegerField()),
+                (
+                    "flow",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="join_barriers",
+                        to="django_workflow_engine.flow",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("flow", "step_id"), name="unique_join_barrier_step"
+                    )
+                ],
+            },
+        ),
+    ]
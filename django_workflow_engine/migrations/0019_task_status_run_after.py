@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_workflow_engine", "0018_join_barrier"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskstatus",
+            name="run_after",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="taskstatus",
+            index=models.Index(
+                condition=models.Q(
+                    ("executed_at__isnull", True), ("run_after__isnull", False)
+                ),
+                fields=["run_after"],
+                name="task_status_run_after_idx",
+            ),
+        ),
+    ]
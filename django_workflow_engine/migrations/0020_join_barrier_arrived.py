@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_workflow_engine", "0019_task_status_run_after"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="joinbarrier",
+            name="remaining",
+        ),
+        migrations.AddField(
+            model_name="joinbarrier",
+            name="arrived",
+            field=models.JSONField(default=list),
+        ),
+    ]
@@ -1,14 +1,17 @@
 import uuid
+from typing import Any, Dict, Optional
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
 from django.db.models.manager import BaseManager
 from django.urls import reverse
+from django.utils import timezone
 
 from django_workflow_engine.dataclass import Workflow
 from django_workflow_engine.exceptions import WorkflowImproperlyConfigured
-from django_workflow_engine.utils import lookup_workflow
+from django_workflow_engine.utils import get_lease_duration, lookup_workflow
 
 if not hasattr(settings, "DJANGO_WORKFLOWS"):
     raise WorkflowImproperlyConfigured("Add DJANGO_WORKFLOWS to your settings")
@@ -26,19 +29,103 @@ class Flow(models.Model):
         on_delete=models.CASCADE,
     )
     started = models.DateTimeField(null=True)
-    running = models.BooleanField(default=False)
+    lease_owner = models.CharField(max_length=255, null=True, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
     finished = models.DateTimeField(null=True, blank=True)
     flow_info = models.JSONField(default=dict)
 
     tasks: BaseManager["TaskStatus"]
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-started"], name="flow_started_idx"),
+            models.Index(
+                fields=["id"],
+                condition=Q(finished__isnull=True),
+                name="flow_unfinished_idx",
+            ),
+        ]
+
     @property
     def is_complete(self):
         return bool(self.finished)
 
+    @property
+    def running(self) -> bool:
+        return bool(self.lease_expires_at and self.lease_expires_at > timezone.now())
+
+    def acquire_lease(self, owner: str) -> bool:
+        """Try to take the lease on this flow.
+
+        The lease is taken with a single conditional UPDATE, so only one owner
+        can hold it at a time. A lease that has expired (e.g. the process
+        holding it crashed) can be taken by anyone, and the current owner can
+        take it again to extend it.
+
+        :param (str) owner: Identifies the holder of the lease.
+        :returns (bool): Whether the lease was acquired.
+        """
+        now = timezone.now()
+        lease_expires_at = now + get_lease_duration()
+
+        acquired = (
+            Flow.objects.filter(pk=self.pk)
+            .filter(
+                Q(lease_expires_at__isnull=True)
+                | Q(lease_expires_at__lte=now)
+                | Q(lease_owner=owner)
+            )
+            .update(lease_owner=owner, lease_expires_at=lease_expires_at)
+        )
+
+        if acquired:
+            self.lease_owner = owner
+            self.lease_expires_at = lease_expires_at
+
+        return bool(acquired)
+
+    def renew_lease(self, owner: str) -> bool:
+        """Extend the lease on this flow, if it is still held by `owner`.
+
+        Unlike `acquire_lease`, this doesn't take a lease that is free or has
+        expired, so it fails once another owner could have taken over.
+
+        :param (str) owner: The holder of the lease.
+        :returns (bool): Whether the lease is still held by `owner`.
+        """
+        lease_expires_at = timezone.now() + get_lease_duration()
+
+        renewed = Flow.objects.filter(pk=self.pk, lease_owner=owner).update(
+            lease_expires_at=lease_expires_at
+        )
+
+        if renewed:
+            self.lease_expires_at = lease_expires_at
+
+        return bool(renewed)
+
+    def release_lease(self, owner: str, finished: Optional[bool] = None) -> None:
+        """Give up the lease on this flow, if it is still held by `owner`.
+
+        :param (str) owner: The holder of the lease.
+        :param (bool) finished: Also mark the flow as finished.
+        """
+        update_fields: Dict[str, Any] = {"lease_owner": None, "lease_expires_at": None}
+        if finished:
+            update_fields["finished"] = self.finished = timezone.now()
+
+        Flow.objects.filter(pk=self.pk, lease_owner=owner).update(**update_fields)
+        self.lease_owner = None
+        self.lease_expires_at = None
+
     @property
     def workflow(self) -> Workflow:
-        return lookup_workflow(self.workflow_name)
+        # Memoize the workflow on the instance, for as long as the name matches.
+        workflow_name, workflow = getattr(self, "_workflow", (None, None))
+        if workflow is None or workflow_name != self.workflow_name:
+            workflow = lookup_workflow(self.workflow_name)
+            self._workflow = (self.workflow_name, workflow)
+        return workflow
 
     @property
     def current_task_status(self):
@@ -55,15 +142,22 @@ class Flow(models.Model):
 
     @property
     def on_manual_step(self):
-        if not self.current_task_status:
+        if hasattr(self, "current_step_id"):
+            # Annotated by the queryset, e.g. in FlowListView.
+            current_step_id = self.current_step_id
+        else:
+            current_task_status = self.current_task_status
+            current_step_id = current_task_status and current_task_status.step_id
+
+        if not current_step_id:
             return False
 
-        current_step = self.workflow.get_step(self.current_task_status.step_id)
+        current_step = self.workflow.get_step(current_step_id)
 
         if not current_step:
             return False
 
-        return not self.workflow.get_step(self.current_task_status.step_id).task.auto
+        return not current_step.task.auto
 
     @property
     def continue_url(self):
@@ -86,10 +180,37 @@ class TaskStatus(models.Model):
     task_name = models.CharField(max_length=100)
     task_info = models.JSONField(default=dict)
     done = models.BooleanField(default=False)
+    # When a task returned RunAfter, it isn't executed again before this.
+    run_after = models.DateTimeField(null=True, blank=True)
 
     targets: BaseManager["Target"]
     log: BaseManager["TaskLog"]
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["flow", "step_id"], name="unique_task_status_step"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["flow", "step_id", "done"],
+                name="task_status_step_done_idx",
+            ),
+            # The frontier of a flow, the TaskStatuses that haven't been executed.
+            models.Index(
+                fields=["flow"],
+                condition=Q(executed_at__isnull=True),
+                name="task_status_unexecuted_idx",
+            ),
+            # The scheduled TaskStatuses, by when they are due.
+            models.Index(
+                fields=["run_after"],
+                condition=Q(executed_at__isnull=True, run_after__isnull=False),
+                name="task_status_run_after_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.step_id} {self.task_name}"
 
@@ -120,55 +241,64 @@ class TaskLog(models.Model):
     )
 
 
-"""
-Old models kept for reference.
-"""
+class JoinBarrier(models.Model):
+    """The predecessors that have arrived at a join step, see `Step.barrier`.
 
+    Created when the first predecessor arrives and deleted once every
+    predecessor that can still run has, when the join step is scheduled.
+    """
 
-class TaskRecordExecution(models.Model):
-    uuid = models.UUIDField(default=uuid.uuid4, editable=False)
-    started_at = models.DateTimeField(auto_now_add=True)
-    executed_at = models.DateTimeField(null=True)
-    executed_by = models.ForeignKey(
-        get_user_model(),
-        on_delete=models.CASCADE,
-        null=True,
-        blank=True,
-        related_name="task_executions",
-    )
     flow = models.ForeignKey(
-        Flow, on_delete=models.CASCADE, related_name="task_executions"
+        Flow, on_delete=models.CASCADE, related_name="join_barriers"
     )
     step_id = models.CharField(max_length=100)
-    task_name = models.CharField(max_length=100)
-    task_info = models.JSONField(default=dict)
-    done = models.BooleanField(default=False)
+    # The step ids of the predecessors that have arrived.
+    arrived = models.JSONField(default=list)
 
-    targets: BaseManager["TaskRecordExecutionTarget"]
-    log: BaseManager["TaskRecordExecutionTaskLog"]
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["flow", "step_id"], name="unique_join_barrier_step"
+            ),
+        ]
 
     def __str__(self):
-        return f"{self.step_id} {self.task_name}"
+        return f"{self.step_id} reached from {', '.join(self.arrived)}"
 
 
-class TaskRecordExecutionTarget(models.Model):
-    target_string = models.CharField(
-        max_length=100,
-        blank=True,
+class OutboxEmail(models.Model):
+    """An email queued by a task, see `DJANGO_WORKFLOW_EMAIL_OUTBOX`.
+
+    Emails are written in the same transaction as the TaskStatus of the task
+    that queued them, and sent later by the `deliver_workflow_emails` command.
+    """
+
+    task_status = models.ForeignKey(
+        TaskStatus,
+        on_delete=models.SET_NULL,
         null=True,
+        blank=True,
+        related_name="outbox_emails",
     )
-    task_record = models.ForeignKey(
-        "TaskRecordExecution",
-        on_delete=models.CASCADE,
-        related_name="targets",
-    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    subject = models.CharField(max_length=998)
+    message = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True, null=True)
+    recipient_list = models.JSONField(default=list)
+    send_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # The emails waiting to be sent.
+            models.Index(
+                fields=["send_after"],
+                condition=Q(sent_at__isnull=True),
+                name="outbox_email_unsent_idx",
+            ),
+        ]
 
-class TaskRecordExecutionTaskLog(models.Model):
-    logged_at = models.DateTimeField(auto_now_add=True)
-    message = models.CharField(max_length=255)
-    task_record = models.ForeignKey(
-        "TaskRecordExecution",
-        related_name="log",
-        on_delete=models.CASCADE,
-    )
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.recipient_list)}"
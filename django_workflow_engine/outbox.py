@@ -0,0 +1,144 @@
+"""django_workflow_engine email outbox.
+
+With `DJANGO_WORKFLOW_EMAIL_OUTBOX` set, `SendEmail` doesn't send its email
+while the flow runs. The email is saved as an `OutboxEmail` in the same
+transaction as the task's TaskStatus, and sent later over a single email
+connection per batch, with failed emails retried with an exponential backoff.
+Delivery is at least once: an email is only marked as sent once its batch has
+been sent. See the `deliver_workflow_emails` management command.
+"""
+from datetime import timedelta
+from typing import List, NamedTuple
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from django_workflow_engine.models import OutboxEmail
+
+# How long a batch of emails is claimed by the deliverer sending it.
+CLAIM_DURATION = timedelta(minutes=5)
+
+# How long to wait before retrying a failed email, doubled after each attempt.
+RETRY_DELAY = timedelta(minutes=1)
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+DELIVERY_FIELDS = ["sent_at", "attempts", "last_error", "send_after"]
+
+
+class DeliveryResult(NamedTuple):
+    sent: int
+    failed: int
+
+
+def due_emails(max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> QuerySet[OutboxEmail]:
+    """Unsent emails that are due and haven't run out of attempts."""
+    return OutboxEmail.objects.filter(
+        sent_at__isnull=True,
+        send_after__lte=timezone.now(),
+        attempts__lt=max_attempts,
+    ).order_by("send_after", "pk")
+
+
+def claim_due_emails(
+    batch_size: int, max_attempts: int = DEFAULT_MAX_ATTEMPTS
+) -> List[OutboxEmail]:
+    """Claim a batch of due emails.
+
+    The emails are claimed by moving their `send_after` past the claim
+    duration with a conditional UPDATE, so deliverers running at the same
+    time send different emails. On databases that support it the candidate
+    rows are also locked with `SELECT ... FOR UPDATE SKIP LOCKED`.
+
+    :param (int) batch_size: The maximum number of emails to claim.
+    :param (int) max_attempts: Emails that have failed this many times are
+        left alone.
+    :returns (list[OutboxEmail]): The claimed emails.
+    """
+    with transaction.atomic():
+        candidates = due_emails(max_attempts)
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        candidate_pks = list(candidates.values_list("pk", flat=True)[:batch_size])
+
+        if not candidate_pks:
+            return []
+
+        now = timezone.now()
+        claimed_until = now + CLAIM_DURATION
+        OutboxEmail.objects.filter(
+            pk__in=candidate_pks, sent_at__isnull=True, send_after__lte=now
+        ).update(send_after=claimed_until)
+
+    return list(
+        OutboxEmail.objects.filter(
+            pk__in=candidate_pks, sent_at__isnull=True, send_after=claimed_until
+        ).order_by("pk")
+    )
+
+
+def deliver_outbox(
+    batch_size: int = 100, max_attempts: int = DEFAULT_MAX_ATTEMPTS
+) -> DeliveryResult:
+    """Send a batch of due emails.
+
+    The emails are sent over one connection of the configured email backend,
+    one message at a time so that a rejected email doesn't fail the others.
+    Failed emails are retried later, after `retry_delay`.
+
+    :param (int) batch_size: The maximum number of emails to send.
+    :param (int) max_attempts: The number of times an email is tried.
+    :returns (DeliveryResult): How many emails were sent and how many failed.
+    """
+    emails = claim_due_emails(batch_size, max_attempts)
+    if not emails:
+        return DeliveryResult(sent=0, failed=0)
+
+    email_connection = get_connection(fail_silently=False)
+    sent = 0
+
+    try:
+        email_connection.open()
+    except Exception as e:
+        for email in emails:
+            record_failure(email, e)
+    else:
+        try:
+            for email in emails:
+                try:
+                    email_connection.send_messages([to_message(email)])
+                except Exception as e:
+                    record_failure(email, e)
+                else:
+                    email.sent_at = timezone.now()
+                    sent += 1
+        finally:
+            email_connection.close()
+
+    OutboxEmail.objects.bulk_update(emails, DELIVERY_FIELDS)
+
+    return DeliveryResult(sent=sent, failed=len(emails) - sent)
+
+
+def to_message(email: OutboxEmail) -> EmailMessage:
+    return EmailMessage(
+        subject=email.subject,
+        body=email.message,
+        from_email=email.from_email,
+        to=email.recipient_list,
+    )
+
+
+def record_failure(email: OutboxEmail, error: Exception) -> None:
+    """Record a failed attempt and when to try the email again."""
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.send_after = timezone.now() + retry_delay(email.attempts)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """How long to wait before the next attempt, after `attempts` failures."""
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
@@ -2,6 +2,7 @@
 
 Surface task things into the framework package.
 """
+from .bulk_send_email import BulkSendEmail
 from .email_form import EmailFormTask
 from .send_email import SendEmail
-from .task import Task, TaskError
+from .task import RunAfter, Task, TaskError
@@ -0,0 +1,129 @@
+from typing import Dict, Iterator, List, Optional, Union
+
+from django.core.mail import EmailMessage, get_connection
+from django.template import Context
+
+from django_workflow_engine.template_cache import get_template
+
+from .task import Task
+
+# How many messages are sent per call to the email backend, unless the step's
+# task_info sets `chunk_size`.
+DEFAULT_CHUNK_SIZE = 100
+
+Recipient = Union[str, Dict]
+
+
+class BulkSendEmail(Task):
+    """Send an email to each of a list of recipients.
+
+    The task_info takes the same `subject`, `message` and `from_email` as
+    `SendEmail`, and either `recipients` or `recipients_key`, the key of the
+    recipients in the flow's flow_info. A recipient is an email address, or a
+    dict with an `email` and anything else the message should be rendered
+    with, available in the template as `recipient`.
+
+    The messages are sent over one connection to the email backend,
+    `chunk_size` at a time, or queued with `DJANGO_WORKFLOW_EMAIL_OUTBOX`.
+    The number of emails sent is saved in the TaskStatus's task_info as
+    `sent` after each chunk, so if sending fails the task carries on from
+    there when it is retried rather than emailing the first recipients again.
+    """
+
+    auto = True
+    task_name = "bulk_send_email"
+    # The progress is saved on the TaskStatus, so it must be saved first.
+    reads_task_statuses = True
+
+    def execute(self, task_info):
+        from django_workflow_engine.utils import email_outbox_enabled
+
+        email_info = self.task_status.task_info | task_info
+        recipients: List[Recipient] = (
+            email_info["recipients"]
+            if "recipients" in email_info
+            else self.flow.flow_info[email_info["recipients_key"]]
+        )
+        chunk_size = email_info.get("chunk_size", DEFAULT_CHUNK_SIZE)
+
+        if email_outbox_enabled():
+            for email in self.render_emails(email_info, recipients):
+                self.queue_email(**email)
+            self.log(f"Queued {len(recipients)} emails")
+            return [], True
+
+        sent: int = self.task_status.task_info.get("sent", 0)
+        emails = self.render_emails(email_info, recipients[sent:])
+
+        with get_connection(fail_silently=False) as connection:
+            for chunk in chunked(emails, chunk_size):
+                connection.send_messages(
+                    [
+                        EmailMessage(
+                            subject=email["subject"],
+                            body=email["message"],
+                            from_email=email["from_email"],
+                            to=email["recipient_list"],
+                        )
+                        for email in chunk
+                    ]
+                )
+                sent += len(chunk)
+                self.save_progress(sent)
+                self.log(f"Sent {sent} of {len(recipients)} emails")
+
+        self.save_progress(None)
+
+        return [], True
+
+    def save_progress(self, sent: Optional[int]) -> None:
+        """Save the number of emails sent in the TaskStatus's task_info.
+
+        :param (int) sent: The number of emails sent, or None once they all
+            have been, so that the step starts over if it is run again.
+        """
+        from django_workflow_engine.models import TaskStatus
+
+        task_info = {
+            key: value
+            for key, value in self.task_status.task_info.items()
+            if key != "sent"
+        }
+        if sent is not None:
+            task_info["sent"] = sent
+
+        self.task_status.task_info = task_info
+        TaskStatus.objects.filter(pk=self.task_status.pk).update(task_info=task_info)
+
+    def render_emails(
+        self, email_info: Dict, recipients: List[Recipient]
+    ) -> Iterator[Dict]:
+        """Render the email of each recipient, one at a time."""
+        message = get_template(email_info["message"])
+        context = Context(
+            self.flow.flow_info
+            | email_info
+            | {"flow": self.flow, "task": self.task_status}
+        )
+
+        for recipient in recipients:
+            if isinstance(recipient, str):
+                recipient = {"email": recipient}
+            with context.push(recipient=recipient):
+                yield {
+                    "subject": email_info["subject"],
+                    "message": message.render(context),
+                    "from_email": email_info["from_email"],
+                    "recipient_list": [recipient["email"]],
+                }
+
+
+def chunked(items: Iterator, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
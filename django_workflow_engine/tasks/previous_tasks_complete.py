@@ -1,6 +1,7 @@
-from typing import Dict, List
+from typing import Dict, Tuple
+
+from django.db.models import Count
 
-from django_workflow_engine.dataclass import Step
 from django_workflow_engine.models import Flow, TaskStatus
 from django_workflow_engine.tasks.task import Task
 
@@ -13,28 +14,21 @@ class PreviousTasksCompleteTask(Task):
         task_status: TaskStatus = self.task_status
         flow: Flow = self.flow
 
-        leaver_complete_step = flow.workflow.get_step(task_status.step_id)
+        graph = flow.workflow.graph
 
-        assert leaver_complete_step
+        assert task_status.step_id in graph.steps
 
         # Get all steps that point to the current step.
-        previous_steps: List[Step] = [
-            step
-            for step in flow.workflow.steps
-            if step.targets != "complete"
-            and leaver_complete_step.step_id in step.targets
-        ]
-
-        all_previous_steps_complete: bool = True
-
-        for previous_step in previous_steps:
-            previous_step_task_completed: bool = flow.tasks.filter(
-                step_id=previous_step.step_id,
-                done=True,
-            ).exists()
-
-            if not previous_step_task_completed:
-                all_previous_steps_complete = False
-                break
-
-        return [], all_previous_steps_complete
+        previous_step_ids: Tuple[str, ...] = graph.predecessors[task_status.step_id]
+
+        if not previous_step_ids:
+            return [], True
+
+        # Count the previous steps that are done in one query, rather than
+        # checking each of them.
+        done_step_count: int = flow.tasks.filter(
+            step_id__in=previous_step_ids,
+            done=True,
+        ).aggregate(done_step_count=Count("step_id", distinct=True))["done_step_count"]
+
+        return [], done_step_count == len(set(previous_step_ids))
@@ -1,5 +1,7 @@
 from django.core.mail import send_mail
-from django.template import Context, Template
+from django.template import Context
+
+from django_workflow_engine.template_cache import get_template
 
 from .task import Task
 
@@ -9,21 +11,27 @@ class SendEmail(Task):
     task_name = "send_email"
 
     def execute(self, task_info):
+        from django_workflow_engine.utils import email_outbox_enabled
+
         email_info = self.task_status.task_info | task_info
 
-        message = Template(email_info["message"])
+        message = get_template(email_info["message"])
         context = Context(
             self.flow.flow_info
             | email_info
             | {"flow": self.flow, "task": self.task_status}
         )
 
-        send_mail(
-            subject=email_info["subject"],
-            message=message.render(context),
-            from_email=email_info["from_email"],
-            recipient_list=email_info["recipient_list"],
-            fail_silently=False,
-        )
+        email = {
+            "subject": email_info["subject"],
+            "message": message.render(context),
+            "from_email": email_info["from_email"],
+            "recipient_list": email_info["recipient_list"],
+        }
+
+        if email_outbox_enabled():
+            self.queue_email(**email)
+        else:
+            send_mail(**email, fail_silently=False)
 
         return [], True
@@ -2,12 +2,15 @@
 
 A task is an instance of a django_workflow_engine.dataclasses.Step
 """
-
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
 from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Tuple, Type, Union
 
+from asgiref.sync import sync_to_async
+
 if TYPE_CHECKING:
-    from django_workflow_engine.models import Flow, TaskStatus
+    from django_workflow_engine.models import Flow, OutboxEmail, TaskLog, TaskStatus
 
 
 class TaskError(Exception):
@@ -21,6 +24,21 @@ class TaskError(Exception):
         self.context = context
 
 
+@dataclass(frozen=True)
+class RunAfter:
+    """Returned by `Task.execute` to have the task executed again once `when`
+    has passed.
+
+    The step stays current, so the flow isn't finished, but it isn't executed
+    by `run_flow` or picked up by the worker until it is due.
+    """
+
+    when: datetime
+
+
+TaskResult = Union[Tuple[Union[List[str], Literal["complete"]], bool], RunAfter]
+
+
 class Task(ABC):
     """Base class for all tasks.
 
@@ -29,6 +47,11 @@ class Task(ABC):
         auto: Whether the task is automatic or manual. Defaults to False (manual).
         abstract: Whether the task is an abstract task. Defaults to False.
         task_name: The name which will be used to map to the task class in `tasks`.
+        reads_task_statuses: Whether the task may query the flow's TaskStatuses
+            or have side effects, so the executor saves the changes of the run
+            before and after the task's wave. Defaults to True, a task that
+            does neither can set it to False to have its changes saved in bulk
+            with the rest of the run.
     """
 
     tasks: dict[str, Type["Task"]] = {}
@@ -36,6 +59,7 @@ class Task(ABC):
     auto: bool = False
     abstract: bool = False
     task_name: Optional[str] = None
+    reads_task_statuses: bool = True
 
     def __init_subclass__(cls, **kwargs) -> None:
         super().__init_subclass__(**kwargs)
@@ -53,6 +77,10 @@ class Task(ABC):
         self.user = user
         self.task_status: "TaskStatus" = task_status
         self.flow: "Flow" = flow
+        # Messages logged by the task, saved once the task has been executed.
+        self.log_messages: List[str] = []
+        # Emails queued by the task, saved with the TaskStatus once executed.
+        self.outbox_emails: List["OutboxEmail"] = []
 
     def setup(self, task_info: Dict) -> None:
         pass
@@ -61,8 +89,73 @@ class Task(ABC):
     def execute(
         self,
         task_info: Dict,
-    ) -> Tuple[Union[List[str], Literal["complete"]], bool]:
+    ) -> TaskResult:
         raise NotImplementedError
 
+    async def aexecute(
+        self,
+        task_info: Dict,
+    ) -> TaskResult:
+        """Execute the task from async code, see `AsyncWorkflowExecutor`.
+
+        Runs `execute` in a thread by default, override this for tasks that
+        can do their work without blocking the event loop.
+        """
+        return await sync_to_async(self.execute)(task_info)
+
+    @property
+    def no_log(self) -> bool:
+        """Whether the step of this task has logging turned off."""
+        step = self.flow.workflow.get_step(self.task_status.step_id)
+        return bool(step and step.no_log)
+
     def log(self, message: str) -> None:
-        self.task_status.log.create(message=message)
+        """Log a message against the task's TaskStatus.
+
+        Messages are buffered and saved in bulk once the task has been
+        executed, even if it raised, unless the step is marked `no_log`.
+        """
+        if self.no_log:
+            return
+        self.log_messages.append(message)
+
+    def collect_log(self) -> List["TaskLog"]:
+        """Build TaskLogs for the buffered messages, without saving them."""
+        from django_workflow_engine.models import TaskLog
+
+        task_logs = [
+            TaskLog(task_status=self.task_status, message=message)
+            for message in self.log_messages
+        ]
+        self.log_messages = []
+        return task_logs
+
+    def queue_email(
+        self,
+        subject: str,
+        message: str,
+        from_email: Optional[str],
+        recipient_list: List[str],
+    ) -> None:
+        """Queue an email to be sent by the `deliver_workflow_emails` command.
+
+        The email is saved in the same transaction as the task's TaskStatus
+        once the task has been executed, and dropped if the task raises.
+        """
+        from django_workflow_engine.models import OutboxEmail
+
+        self.outbox_emails.append(
+            OutboxEmail(
+                task_status=self.task_status,
+                subject=subject,
+                message=message,
+                from_email=from_email,
+                recipient_list=recipient_list,
+            )
+        )
+
+    def collect_outbox_emails(self) -> List["OutboxEmail"]:
+        """The queued emails, without saving them."""
+        outbox_emails = self.outbox_emails
+        self.outbox_emails = []
+        return outbox_emails
@@ -0,0 +1,101 @@
+"""django_workflow_engine template cache.
+
+Tasks such as `SendEmail` render templates whose source comes from the
+workflow definition, so the same source is rendered over and over. Compiled
+templates are kept in a bounded LRU cache keyed by a hash of their source, and
+the cache is cleared when the template settings change.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template import Template
+
+# How many compiled templates are kept, unless DJANGO_WORKFLOW_TEMPLATE_CACHE_SIZE
+# is set.
+DEFAULT_TEMPLATE_CACHE_SIZE = 256
+
+
+class TemplateCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+_templates: "OrderedDict[str, Template]" = OrderedDict()
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def get_template_cache_size() -> int:
+    """How many compiled templates are kept.
+
+    Configured with the `DJANGO_WORKFLOW_TEMPLATE_CACHE_SIZE` setting.
+    """
+    return getattr(
+        settings, "DJANGO_WORKFLOW_TEMPLATE_CACHE_SIZE", DEFAULT_TEMPLATE_CACHE_SIZE
+    )
+
+
+def get_template(source: str) -> Template:
+    """Get the compiled template for a template source.
+
+    :param (str) source: The template source.
+    :returns (Template): The compiled template, from the cache if it has been
+        compiled before.
+    """
+    global _hits, _misses
+
+    key = hashlib.sha256(source.encode()).hexdigest()
+
+    with _lock:
+        template = _templates.get(key)
+        if template is not None:
+            _templates.move_to_end(key)
+            _hits += 1
+            return template
+        _misses += 1
+
+    # Compile outside the lock, at worst a template is compiled twice.
+    template = Template(source)
+
+    with _lock:
+        _templates[key] = template
+        _templates.move_to_end(key)
+        while len(_templates) > get_template_cache_size():
+            _templates.popitem(last=False)
+
+    return template
+
+
+def template_cache_info() -> TemplateCacheInfo:
+    """The hits, misses and size of the template cache."""
+    with _lock:
+        return TemplateCacheInfo(
+            hits=_hits,
+            misses=_misses,
+            maxsize=get_template_cache_size(),
+            currsize=len(_templates),
+        )
+
+
+def clear_template_cache() -> None:
+    """Forget every compiled template and reset the statistics."""
+    global _hits, _misses
+
+    with _lock:
+        _templates.clear()
+        _hits = 0
+        _misses = 0
+
+
+@receiver(setting_changed)
+def clear_template_cache_on_setting_changed(*, setting, **kwargs) -> None:
+    if setting in ("TEMPLATES", "DJANGO_WORKFLOW_TEMPLATE_CACHE_SIZE"):
+        clear_template_cache()
@@ -0,0 +1,21 @@
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import override_settings
+
+
+@pytest.fixture
+def migrate():
+    """Migrate to the given migration, and back to the latest afterwards."""
+
+    def migrate(target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+        return executor.loader.project_state([target]).apps
+
+    yield migrate
+
+    # Tests may leave legacy task records behind, drop them with the tables.
+    with override_settings(DJANGO_WORKFLOW_DROP_LEGACY_TASK_RECORDS=True):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
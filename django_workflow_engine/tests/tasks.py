@@ -1,6 +1,11 @@
+import asyncio
+import time
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
-from django_workflow_engine.tasks.task import Task
+from django_workflow_engine.tasks.task import RunAfter, Task
 
 User = get_user_model()
 
@@ -19,6 +24,43 @@ class BasicTask(Task):
         return [], True
 
 
+class BulkSavedTask(BasicTask):
+    task_name = "bulk_saved_task"
+    reads_task_statuses = False
+
+
+class StepDoneTask(Task):
+    task_name = "step_done_task"
+    auto = True
+
+    def execute(self, task_info):
+        done = self.flow.tasks.filter(step_id=task_info["step_id"], done=True)
+        self.log(f"{task_info['step_id']} done: {done.exists()}")
+        return [], True
+
+
+class SleepTask(Task):
+    task_name = "sleep_task"
+    auto = True
+    seconds = 0.2
+
+    def execute(self, task_info):
+        time.sleep(self.seconds)
+        return [], True
+
+    async def aexecute(self, task_info):
+        await asyncio.sleep(self.seconds)
+        return [], True
+
+
+class ManualTask(Task):
+    task_name = "manual_task"
+    auto = False
+
+    def execute(self, task_info):
+        return [], True
+
+
 class PauseTask(Task):
     task_name = "pause_task"
     auto = True
@@ -27,6 +69,19 @@ class PauseTask(Task):
         return [], False
 
 
+class WaitTask(Task):
+    task_name = "wait_task"
+    auto = True
+
+    def execute(self, task_info):
+        # Wait once, then complete when executed again.
+        if self.task_status.run_after is None:
+            return RunAfter(
+                timezone.now() + timedelta(seconds=task_info.get("seconds", 3600))
+            )
+        return [], True
+
+
 class ErrorTask(Task):
     task_name = "error_task"
     auto = True
@@ -35,6 +90,26 @@ class ErrorTask(Task):
         raise Exception("Error")
 
 
+class LogTask(Task):
+    task_name = "log_task"
+    auto = True
+
+    def execute(self, task_info):
+        for i in range(task_info.get("messages", 3)):
+            self.log(f"Message {i}")
+        if task_info.get("error"):
+            raise Exception("Error")
+        return [], True
+
+
+class DecisionTask(Task):
+    task_name = "decision_task"
+    auto = True
+
+    def execute(self, task_info):
+        return task_info["choice"], True
+
+
 class SelfReferencingPauseTask(Task):
     task_name = "self_ref_pause_task"
     auto = True
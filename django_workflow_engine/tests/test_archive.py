@@ -0,0 +1,121 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from django_workflow_engine.archive import archive_flows, read_archived_flows
+from django_workflow_engine.models import Flow, Target, TaskLog, TaskStatus
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import linear_workflow
+
+
+@pytest.fixture
+def flows(settings):
+    flows = []
+    for days_ago in [100, 100, 100, 10]:
+        flow, executor, test_user = set_up_flow(settings, linear_workflow)
+        executor.run_flow(user=test_user)
+        Flow.objects.filter(pk=flow.pk).update(
+            finished=timezone.now() - timedelta(days=days_ago)
+        )
+        TaskLog.objects.create(
+            task_status=flow.tasks.first(), message=f"Flow {flow.pk}"
+        )
+        flows.append(flow)
+    return flows
+
+
+@pytest.mark.django_db
+def test_archive_flows(flows, django_assert_max_num_queries):
+    file = StringIO()
+
+    with django_assert_max_num_queries(30):
+        batch_counts = list(archive_flows(file, timedelta(days=90), batch_size=2))
+
+    assert batch_counts == [2, 1]
+    assert list(Flow.objects.all()) == [flows[-1]]
+    assert not TaskStatus.objects.exclude(flow=flows[-1]).exists()
+    assert not Target.objects.exclude(task_status__flow=flows[-1]).exists()
+    assert TaskLog.objects.count() == 1
+
+    records = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert [record["flow"]["id"] for record in records] == [
+        flow.pk for flow in flows[:3]
+    ]
+    tasks = records[0]["tasks"]
+    assert [task["step_id"] for task in tasks] == [
+        step.step_id for step in linear_workflow.steps
+    ]
+    assert tasks[0]["targets"][0]["target_string"] == linear_workflow.steps[1].step_id
+    assert tasks[0]["log"][0]["message"] == f"Flow {flows[0].pk}"
+
+
+@pytest.mark.django_db
+def test_archive_flows_runs_delete_signals(flows):
+    deleted = []
+
+    def receiver(sender, instance, **kwargs):
+        deleted.append(instance.flow_id)
+
+    post_delete.connect(receiver, sender=TaskStatus)
+    try:
+        list(archive_flows(StringIO(), timedelta(days=90)))
+    finally:
+        post_delete.disconnect(receiver, sender=TaskStatus)
+
+    steps = len(linear_workflow.steps)
+    assert sorted(deleted) == [flow.pk for flow in flows[:3] for _ in range(steps)]
+    assert list(Flow.objects.all()) == [flows[-1]]
+    assert TaskLog.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_archive_flows_writes_before_delete(flows):
+    file = StringIO()
+
+    with mock.patch(
+        "django_workflow_engine.archive.delete_flows",
+        side_effect=Exception("Deadlock"),
+    ):
+        with pytest.raises(Exception, match="Deadlock"):
+            list(archive_flows(file, timedelta(days=90)))
+
+    assert len(file.getvalue().splitlines()) == 3
+    assert Flow.objects.count() == 4
+
+    list(archive_flows(file, timedelta(days=90)))
+
+    # The flows were written twice, but are read once.
+    assert len(file.getvalue().splitlines()) == 6
+    file.seek(0)
+    assert [record["flow"]["id"] for record in read_archived_flows(file)] == [
+        flow.pk for flow in flows[:3]
+    ]
+
+
+@pytest.mark.django_db
+def test_archive_workflow_flows_command(flows, tmp_path):
+    output = tmp_path / "flows.jsonl.gz"
+    stdout = StringIO()
+
+    call_command("archive_workflow_flows", dry_run=True, stdout=stdout)
+    assert "3 flows would be archived." in stdout.getvalue()
+    assert Flow.objects.count() == 4
+
+    with mock.patch(
+        "django_workflow_engine.archive.os.fsync", wraps=os.fsync
+    ) as mock_fsync:
+        call_command("archive_workflow_flows", output=str(output), stdout=stdout)
+    assert "Archived 3 flows" in stdout.getvalue()
+    assert Flow.objects.count() == 1
+    mock_fsync.assert_called_once()
+
+    with gzip.open(output, "rt") as file:
+        assert len(list(read_archived_flows(file))) == 3
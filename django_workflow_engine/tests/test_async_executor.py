@@ -0,0 +1,126 @@
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+
+from django_workflow_engine import COMPLETE
+from django_workflow_engine.async_executor import AsyncWorkflowExecutor
+from django_workflow_engine.dataclass import Step, Workflow
+from django_workflow_engine.models import TaskStatus
+from django_workflow_engine.tests.tasks import BasicTask, SleepTask
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import (
+    manual_task_workflow,
+    previous_tasks_complete_workflow,
+)
+
+sleep_split_workflow = Workflow(
+    name="sleep_split_workflow",
+    steps=[
+        Step(
+            step_id="start",
+            task_name=BasicTask.task_name,
+            start=True,
+            targets=["task_a", "task_b"],
+        ),
+        Step(
+            step_id="task_a",
+            task_name=SleepTask.task_name,
+            targets=COMPLETE,
+        ),
+        Step(
+            step_id="task_b",
+            task_name=SleepTask.task_name,
+            targets=COMPLETE,
+        ),
+    ],
+)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_split_and_join_workflow(settings):
+    flow, _, test_user = set_up_flow(settings, previous_tasks_complete_workflow)
+    executor = AsyncWorkflowExecutor(flow)
+
+    async_to_sync(executor.arun_flow)(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert not flow.running
+    assert [task_status.step_id for task_status in TaskStatus.objects.all()] == [
+        "start",
+        "task_a",
+        "task_b",
+        "task_c",
+    ]
+    assert TaskStatus.objects.filter(done=True).count() == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_branches_run_concurrently(settings):
+    flow, _, test_user = set_up_flow(settings, sleep_split_workflow)
+    executor = AsyncWorkflowExecutor(flow)
+
+    started = time.monotonic()
+    async_to_sync(executor.arun_flow)(user=test_user)
+
+    assert time.monotonic() - started < SleepTask.seconds * 2
+    flow.refresh_from_db()
+    assert flow.is_complete
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_manual_task_workflow(settings):
+    flow, _, test_user = set_up_flow(settings, manual_task_workflow)
+    executor = AsyncWorkflowExecutor(flow)
+
+    async_to_sync(executor.arun_flow)(user=test_user)
+
+    flow.refresh_from_db()
+    assert not flow.is_complete
+    assert flow.tasks.count() == 2
+
+    async_to_sync(executor.aexecute_step)(
+        user=test_user, step=manual_task_workflow.get_step("manual")
+    )
+    assert flow.tasks.count() == 2
+
+
+retarget_workflow = Workflow(
+    name="retarget_workflow",
+    steps=[
+        Step(
+            step_id="start",
+            task_name=BasicTask.task_name,
+            start=True,
+            targets=["target"],
+        ),
+        Step(step_id="target", task_name=BasicTask.task_name, targets=COMPLETE),
+    ],
+)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_retargeted_step(settings):
+    flow, _, test_user = set_up_flow(settings, retarget_workflow)
+    start, target = retarget_workflow.steps
+    TaskStatus.objects.create(
+        flow=flow, step_id=start.step_id, task_name=start.task_name
+    )
+    # Executed before the workflow changed the target's task.
+    TaskStatus.objects.create(
+        flow=flow,
+        step_id=target.step_id,
+        task_name="old_task",
+        executed_at=timezone.now(),
+        done=True,
+    )
+
+    async_to_sync(AsyncWorkflowExecutor(flow).arun_flow)(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    task_status = TaskStatus.objects.get(flow=flow, step_id=target.step_id)
+    assert task_status.task_name == target.task_name
+    assert TaskStatus.objects.filter(flow=flow, done=True).count() == 2
@@ -0,0 +1,120 @@
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail import get_connection
+
+from django_workflow_engine.executor import WorkflowExecutor
+from django_workflow_engine.models import Flow, OutboxEmail, TaskLog, TaskStatus
+from django_workflow_engine.tests.factories import UserFactory
+from django_workflow_engine.tests.workflows import bulk_send_email_workflow
+
+TEMPLATES = [{"BACKEND": "django.template.backends.django.DjangoTemplates"}]
+
+MANAGERS = [
+    {"email": "ann@example.com", "name": "Ann"},
+    {"email": "bob@example.com", "name": "Bob"},
+    {"email": "cat@example.com", "name": "Cat"},
+    "dan@example.com",
+    {"email": "eve@example.com", "name": "Eve"},
+]
+
+
+@pytest.fixture
+def flow(settings):
+    settings.TEMPLATES = TEMPLATES
+    settings.DJANGO_WORKFLOWS = {"bulk_send_email_workflow": bulk_send_email_workflow}
+    return Flow.objects.create(
+        workflow_name="bulk_send_email_workflow",
+        flow_name="new_starter",
+        executed_by=UserFactory(),
+        flow_info={"managers": MANAGERS},
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_send_email(flow):
+    with mock.patch(
+        "django_workflow_engine.tasks.bulk_send_email.get_connection",
+        wraps=get_connection,
+    ) as mock_get_connection:
+        WorkflowExecutor(flow).run_flow(user=flow.executed_by)
+
+    mock_get_connection.assert_called_once()
+    assert [(email.to, email.body) for email in mail.outbox] == [
+        (["ann@example.com"], "Hello Ann, new_starter started"),
+        (["bob@example.com"], "Hello Bob, new_starter started"),
+        (["cat@example.com"], "Hello Cat, new_starter started"),
+        (["dan@example.com"], "Hello , new_starter started"),
+        (["eve@example.com"], "Hello Eve, new_starter started"),
+    ]
+    assert list(
+        TaskLog.objects.filter(task_status__flow=flow)
+        .order_by("pk")
+        .values_list("message", flat=True)
+    ) == [
+        "Sent 2 of 5 emails",
+        "Sent 4 of 5 emails",
+        "Sent 5 of 5 emails",
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_send_email_sends_chunks(flow):
+    with mock.patch(
+        "django.core.mail.backends.locmem.EmailBackend.send_messages",
+        return_value=2,
+    ) as mock_send_messages:
+        WorkflowExecutor(flow).run_flow(user=flow.executed_by)
+
+    assert [len(call.args[0]) for call in mock_send_messages.call_args_list] == [
+        2,
+        2,
+        1,
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_send_email_retry_skips_sent_chunks(flow):
+    def send_messages(self, messages):
+        if messages[0].to == ["cat@example.com"] and not retrying:
+            raise ConnectionError("Connection refused")
+        mail.outbox.extend(messages)
+        return len(messages)
+
+    with mock.patch(
+        "django.core.mail.backends.locmem.EmailBackend.send_messages", send_messages
+    ):
+        retrying = False
+        WorkflowExecutor(flow).run_flow(user=flow.executed_by)
+
+        task_status = TaskStatus.objects.get(flow=flow)
+        assert not task_status.done
+        assert task_status.task_info["sent"] == 2
+
+        retrying = True
+        WorkflowExecutor(flow).run_flow(user=flow.executed_by)
+
+    assert [email.to for email in mail.outbox] == [
+        [manager["email"]] if isinstance(manager, dict) else [manager]
+        for manager in MANAGERS
+    ]
+    task_status.refresh_from_db()
+    assert task_status.done
+    assert "sent" not in task_status.task_info
+
+
+@pytest.mark.django_db
+def test_bulk_send_email_queues_emails(flow, settings):
+    settings.DJANGO_WORKFLOW_EMAIL_OUTBOX = True
+
+    WorkflowExecutor(flow).run_flow(user=flow.executed_by)
+
+    assert not mail.outbox
+    assert list(
+        OutboxEmail.objects.order_by("pk").values_list("recipient_list", flat=True)
+    ) == [
+        [manager["email"]] if isinstance(manager, dict) else [manager]
+        for manager in MANAGERS
+    ]
+    assert TaskLog.objects.get().message == "Queued 5 emails"
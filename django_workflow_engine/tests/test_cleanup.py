@@ -0,0 +1,85 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from django_workflow_engine.tests.factories import UserFactory
+
+BEFORE_DEDUPE = ("django_workflow_engine", "0013_flow_lease")
+
+
+@pytest.fixture
+def legacy_apps(migrate):
+    """Three flows with duplicate TaskRecords, before migration 0014."""
+    legacy_apps = migrate(BEFORE_DEDUPE)
+    Flow = legacy_apps.get_model("django_workflow_engine", "Flow")
+    TaskStatus = legacy_apps.get_model("django_workflow_engine", "TaskStatus")
+    Target = legacy_apps.get_model("django_workflow_engine", "Target")
+
+    user = UserFactory()
+    for flow_name in ["a", "b", "finished"]:
+        flow = Flow.objects.create(
+            workflow_name="test_workflow",
+            flow_name=flow_name,
+            executed_by_id=user.pk,
+            finished=timezone.now() if flow_name == "finished" else None,
+        )
+        for name in ["first", "executed", "duplicate"]:
+            task_status = TaskStatus.objects.create(
+                flow=flow,
+                step_id="start",
+                task_name=name,
+                executed_at=timezone.now() if name == "executed" else None,
+            )
+            Target.objects.create(task_status=task_status, target_string="end")
+
+    return legacy_apps
+
+
+def get_task_names(legacy_apps):
+    TaskStatus = legacy_apps.get_model("django_workflow_engine", "TaskStatus")
+    return list(
+        TaskStatus.objects.order_by("pk").values_list("flow__flow_name", "task_name")
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cleanup_in_batches(legacy_apps):
+    stdout = StringIO()
+    call_command("cleanup_workflow_engine", batch_size=1, stdout=stdout)
+
+    output = stdout.getvalue()
+    assert "Checked 1 flows, deleted 1 duplicate TaskRecords" in output
+    assert "Checked 2 flows, deleted 2 duplicate TaskRecords" in output
+    assert output.endswith("Done.\n")
+    # The first unexecuted and the executed TaskRecords of a step are kept,
+    # finished flows are left alone.
+    assert get_task_names(legacy_apps) == [
+        ("a", "first"),
+        ("a", "executed"),
+        ("b", "first"),
+        ("b", "executed"),
+        ("finished", "first"),
+        ("finished", "executed"),
+        ("finished", "duplicate"),
+    ]
+    Target = legacy_apps.get_model("django_workflow_engine", "Target")
+    assert Target.objects.count() == 7
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cleanup_dry_run(legacy_apps):
+    stdout = StringIO()
+    call_command("cleanup_workflow_engine", dry_run=True, stdout=stdout)
+
+    assert "Checked 2 flows, found 2 duplicate TaskRecords" in stdout.getvalue()
+    assert len(get_task_names(legacy_apps)) == 9
+
+
+@pytest.mark.django_db
+def test_cleanup_after_dedupe_migration():
+    stdout = StringIO()
+    call_command("cleanup_workflow_engine", stdout=stdout)
+
+    assert "there is nothing to clean up" in stdout.getvalue()
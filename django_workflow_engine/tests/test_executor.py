@@ -0,0 +1,129 @@
+import pytest
+from django.db import connection
+
+from django_workflow_engine import COMPLETE
+from django_workflow_engine.dataclass import Step, Workflow
+from django_workflow_engine.models import Target, TaskLog, TaskStatus
+from django_workflow_engine.tests.tasks import BasicTask, BulkSavedTask, StepDoneTask
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import linear_workflow
+
+
+@pytest.mark.django_db
+def test_save_pending_changes_upserts_task_statuses(settings):
+    """
+    A TaskStatus created by someone else in the meantime is overwritten and
+    reused, rather than duplicated.
+    """
+    flow, executor, test_user = set_up_flow(settings, linear_workflow)
+    step = linear_workflow.steps[1]
+
+    [task_status] = executor.get_or_build_task_statuses([step])
+    assert task_status.pk is None
+    # Executed in the run before it was saved.
+    executor.mark_executed(user=test_user, task_status=task_status, done=False)
+    task_status.task_info = {"a": 1}
+
+    existing_task_status = TaskStatus.objects.create(
+        flow=flow,
+        step_id=step.step_id,
+        task_name=step.task_name,
+        executed_at="2024-01-01T00:00:00Z",
+        done=True,
+    )
+
+    executor.save_pending_changes()
+
+    assert task_status.pk == existing_task_status.pk
+    assert flow.tasks.count() == 1
+    existing_task_status.refresh_from_db()
+    assert existing_task_status.executed_at == task_status.executed_at
+    assert existing_task_status.executed_by == test_user
+    assert not existing_task_status.done
+    assert existing_task_status.task_info == {"a": 1}
+
+
+@pytest.mark.django_db
+def test_save_pending_changes_without_upsert(settings, monkeypatch):
+    """
+    Without `ON CONFLICT ... DO UPDATE` the existing TaskStatus is reused and
+    updated afterwards.
+    """
+    monkeypatch.setattr(
+        connection.features, "supports_update_conflicts_with_target", False
+    )
+    flow, executor, test_user = set_up_flow(settings, linear_workflow)
+    step = linear_workflow.steps[1]
+
+    [task_status] = executor.get_or_build_task_statuses([step])
+    executor.mark_executed(user=test_user, task_status=task_status, done=True)
+    existing_task_status = TaskStatus.objects.create(
+        flow=flow, step_id=step.step_id, task_name=step.task_name
+    )
+
+    executor.save_pending_changes()
+
+    assert task_status.pk == existing_task_status.pk
+    assert flow.tasks.count() == 1
+    existing_task_status.refresh_from_db()
+    assert existing_task_status.done
+    assert existing_task_status.executed_by == test_user
+
+
+long_linear_workflow = Workflow(
+    name="long_linear_workflow",
+    steps=[
+        Step(
+            step_id=f"step_{i}",
+            task_name=BulkSavedTask.task_name,
+            start=i == 0,
+            targets=[f"step_{i + 1}"] if i < 199 else COMPLETE,
+        )
+        for i in range(200)
+    ],
+)
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="Bulk batch sizes depend on the database"
+)
+@pytest.mark.django_db
+def test_long_flow_queries(settings, django_assert_num_queries):
+    """
+    The changes of a run whose tasks don't read TaskStatuses are saved in bulk
+    once, rather than per step or wave.
+    """
+    flow, executor, test_user = set_up_flow(settings, long_linear_workflow)
+
+    # Taking and releasing the lease (2), creating the first TaskStatus (6),
+    # loading the TaskStatuses (1), one transaction to save the run (8,
+    # renewing the lease and inserting 199 TaskStatuses in 3 batches on
+    # SQLite) and checking for remaining steps (1).
+    with django_assert_num_queries(18):
+        executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert TaskStatus.objects.filter(flow=flow, done=True).count() == 200
+    assert Target.objects.filter(task_status__flow=flow).count() == 199
+
+
+@pytest.mark.django_db
+def test_tasks_see_earlier_waves(settings):
+    workflow = Workflow(
+        name="step_done_workflow",
+        steps=[
+            Step(step_id="a", task_name=BasicTask.task_name, start=True, targets=["b"]),
+            Step(
+                step_id="b",
+                task_name=StepDoneTask.task_name,
+                targets=COMPLETE,
+                task_info={"step_id": "a"},
+            ),
+        ],
+    )
+    flow, executor, test_user = set_up_flow(settings, workflow)
+
+    executor.run_flow(user=test_user)
+
+    assert TaskLog.objects.get(task_status__flow=flow).message == "a done: True"
@@ -0,0 +1,58 @@
+import pytest
+
+from django_workflow_engine.dataclass import Step, Workflow
+from django_workflow_engine.exceptions import WorkflowImproperlyConfigured
+from django_workflow_engine.graph import WorkflowGraph
+from django_workflow_engine.tests.tasks import BasicTask
+from django_workflow_engine.tests.workflows import (
+    complex_loops_workflow,
+    linear_workflow,
+    previous_tasks_complete_workflow,
+)
+
+
+def test_graph_is_compiled_once():
+    assert linear_workflow.graph is linear_workflow.graph
+    assert isinstance(linear_workflow.graph, WorkflowGraph)
+
+
+def test_graph_step_index():
+    graph = linear_workflow.graph
+
+    assert graph.start_step is linear_workflow.steps[0]
+    assert graph.first_step is linear_workflow.steps[0]
+    assert graph.get_step("task_a") is linear_workflow.steps[1]
+    assert graph.get_step("not_a_real_step_id") is None
+
+
+def test_graph_adjacency():
+    graph = previous_tasks_complete_workflow.graph
+
+    assert graph.successors["start"] == ("task_a", "task_b")
+    assert graph.successors["task_c"] == ()
+    assert graph.predecessors["start"] == ()
+    assert graph.predecessors["task_c"] == ("task_a", "task_b")
+
+
+def test_graph_last_in_loop():
+    graph = complex_loops_workflow.graph
+
+    assert graph.last_in_loop == {"task_a_remind_creator", "task_c"}
+
+
+def test_graph_without_start_step():
+    workflow = Workflow(
+        name="no_start_workflow",
+        steps=[
+            Step(
+                step_id="task_a",
+                task_name=BasicTask.task_name,
+                targets=["task_a"],
+            ),
+        ],
+    )
+
+    assert workflow.graph.loops == ()
+
+    with pytest.raises(WorkflowImproperlyConfigured):
+        workflow.first_step
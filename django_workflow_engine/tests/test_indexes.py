@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+
+from django_workflow_engine.models import Flow, TaskStatus
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import linear_workflow
+from django_workflow_engine.worker import runnable_flows
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="Query plans are checked on SQLite"
+)
+
+
+@pytest.fixture
+def flow(settings):
+    flow, executor, test_user = set_up_flow(settings, linear_workflow)
+    executor.run_flow(user=test_user)
+    return flow
+
+
+@pytest.mark.django_db
+def test_unexecuted_task_statuses_use_partial_index(flow):
+    plan = TaskStatus.objects.filter(flow=flow, executed_at__isnull=True).explain()
+    assert "task_status_unexecuted_idx" in plan
+
+
+@pytest.mark.django_db
+def test_task_status_step_uses_unique_index(flow):
+    plan = TaskStatus.objects.filter(flow=flow, step_id="start").explain()
+    # SQLite creates the index of a unique constraint with the table.
+    assert "INDEX" in plan
+    assert "(flow_id=? AND step_id=?)" in plan
+
+
+@pytest.mark.django_db
+def test_task_status_step_done_uses_index(flow):
+    plan = (
+        TaskStatus.objects.filter(flow=flow, step_id__in=["start", "task_a"])
+        .filter(done=True)
+        .values("step_id")
+        .explain()
+    )
+    assert "task_status_step_done_idx" in plan
+
+
+@pytest.mark.django_db
+def test_unfinished_flows_use_partial_index(flow):
+    plan = Flow.objects.filter(finished__isnull=True).order_by("pk").explain()
+    assert "flow_unfinished_idx" in plan
+
+
+@pytest.mark.django_db
+def test_flow_list_ordering_uses_index(flow):
+    plan = Flow.objects.order_by("-started").explain()
+    assert "flow_started_idx" in plan
+
+
+@pytest.mark.django_db
+def test_runnable_flows_use_run_after_index(flow):
+    plan = runnable_flows().explain()
+    # Due TaskStatuses are found with a range scan, unscheduled ones from the
+    # unexecuted TaskStatuses.
+    assert "SEARCH" in plan
+    assert "USING INDEX task_status_run_after_idx (run_after" in plan
+    assert "task_status_unexecuted_idx" in plan
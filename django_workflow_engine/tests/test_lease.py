@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+
+from django_workflow_engine.async_executor import AsyncWorkflowExecutor
+from django_workflow_engine.exceptions import WorkflowError
+from django_workflow_engine.models import Flow, TaskStatus
+from django_workflow_engine.tests.tasks import BasicTask
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import linear_workflow
+
+
+@pytest.mark.django_db
+def test_lease_is_exclusive(settings):
+    flow, executor, test_user = set_up_flow(settings, linear_workflow)
+
+    assert flow.acquire_lease("worker-1")
+    assert flow.running
+
+    other_flow = Flow.objects.get(pk=flow.pk)
+    assert not other_flow.acquire_lease("worker-2")
+    # The owner can extend its own lease.
+    assert other_flow.acquire_lease("worker-1")
+
+    with pytest.raises(WorkflowError, match="Flow already running"):
+        executor.run_flow(user=test_user)
+
+    assert not flow.tasks.exists()
+
+
+@pytest.mark.django_db
+def test_expired_lease_is_reclaimed(settings):
+    flow, executor, test_user = set_up_flow(settings, linear_workflow)
+
+    # A worker took the lease and died.
+    Flow.objects.filter(pk=flow.pk).update(
+        lease_owner="dead-worker",
+        lease_expires_at=timezone.now() - timedelta(seconds=1),
+    )
+    flow.refresh_from_db()
+    assert not flow.running
+
+    executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert not flow.running
+    assert flow.lease_owner is None
+
+
+@mock.patch(
+    "django_workflow_engine.executor.WorkflowExecutor.execute_steps",
+    side_effect=Exception("Error"),
+)
+@pytest.mark.django_db
+def test_lease_released_on_error(mock_execute_steps, settings):
+    flow, executor, test_user = set_up_flow(settings, linear_workflow)
+
+    with pytest.raises(Exception, match="Error"):
+        executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert not flow.running
+    assert not flow.is_complete
+    assert flow.acquire_lease("worker-1")
+
+
+@pytest.mark.parametrize("run_async", [False, True])
+@pytest.mark.django_db(transaction=True)
+def test_lost_lease_discards_changes(settings, run_async):
+    flow, executor, test_user = set_up_flow(settings, linear_workflow)
+    if run_async:
+        run_flow = async_to_sync(AsyncWorkflowExecutor(flow).arun_flow)
+    else:
+        run_flow = executor.run_flow
+
+    def steal_lease(task_info):
+        # Another worker takes over the flow, e.g. after this one stalled.
+        Flow.objects.filter(pk=flow.pk).update(lease_owner="worker-2")
+        return [], True
+
+    with mock.patch.object(BasicTask, "execute", side_effect=steal_lease):
+        with pytest.raises(WorkflowError, match="Lost the lease on the flow"):
+            run_flow(user=test_user)
+
+    task_status = TaskStatus.objects.get(flow=flow)
+    assert task_status.step_id == linear_workflow.steps[0].step_id
+    assert task_status.executed_at is None
+    assert not task_status.done
+    flow.refresh_from_db()
+    assert flow.lease_owner == "worker-2"
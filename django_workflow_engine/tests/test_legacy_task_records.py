@@ -0,0 +1,98 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from django_workflow_engine.archive import legacy_task_records_exist
+from django_workflow_engine.exceptions import WorkflowImproperlyConfigured
+from django_workflow_engine.tests.factories import UserFactory
+
+BEFORE_REMOVAL = ("django_workflow_engine", "0015_task_status_indexes")
+REMOVAL = ("django_workflow_engine", "0016_delete_legacy_task_records")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_legacy_task_records(migrate, tmp_path):
+    legacy_apps = migrate(BEFORE_REMOVAL)
+    Flow = legacy_apps.get_model("django_workflow_engine", "Flow")
+    TaskRecordExecution = legacy_apps.get_model(
+        "django_workflow_engine", "TaskRecordExecution"
+    )
+    TaskRecordExecutionTarget = legacy_apps.get_model(
+        "django_workflow_engine", "TaskRecordExecutionTarget"
+    )
+    TaskRecordExecutionTaskLog = legacy_apps.get_model(
+        "django_workflow_engine", "TaskRecordExecutionTaskLog"
+    )
+
+    user = UserFactory()
+    flow = Flow.objects.create(
+        workflow_name="test_workflow", flow_name="test_flow", executed_by_id=user.pk
+    )
+    for step_id in ["start", "end"]:
+        task_record = TaskRecordExecution.objects.create(
+            flow=flow, step_id=step_id, task_name="basic_task", task_info={"a": 1}
+        )
+        TaskRecordExecutionTarget.objects.create(
+            task_record=task_record, target_string="end"
+        )
+        TaskRecordExecutionTaskLog.objects.create(
+            task_record=task_record, message=f"Ran {step_id}"
+        )
+
+    output = tmp_path / "task_records.jsonl.gz"
+    stdout = StringIO()
+    call_command(
+        "export_legacy_task_records",
+        output=str(output),
+        batch_size=1,
+        delete=True,
+        stdout=stdout,
+    )
+
+    assert "Exported 2 task records" in stdout.getvalue()
+    assert not TaskRecordExecution.objects.exists()
+    assert not TaskRecordExecutionTaskLog.objects.exists()
+
+    with gzip.open(output, "rt") as file:
+        records = [json.loads(line) for line in file]
+    assert [record["step_id"] for record in records] == ["start", "end"]
+    assert records[0]["task_info"] == {"a": 1}
+    assert records[0]["targets"][0]["target_string"] == "end"
+    assert records[1]["log"][0]["message"] == "Ran end"
+
+    migrate(REMOVAL)
+    assert not legacy_task_records_exist()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_removal_requires_export(migrate, settings):
+    legacy_apps = migrate(BEFORE_REMOVAL)
+    Flow = legacy_apps.get_model("django_workflow_engine", "Flow")
+    TaskRecordExecution = legacy_apps.get_model(
+        "django_workflow_engine", "TaskRecordExecution"
+    )
+    flow = Flow.objects.create(
+        workflow_name="test_workflow",
+        flow_name="test_flow",
+        executed_by_id=UserFactory().pk,
+    )
+    TaskRecordExecution.objects.create(flow=flow, step_id="start", task_name="a")
+
+    with pytest.raises(WorkflowImproperlyConfigured):
+        migrate(REMOVAL)
+    assert legacy_task_records_exist()
+
+    settings.DJANGO_WORKFLOW_DROP_LEGACY_TASK_RECORDS = True
+    migrate(REMOVAL)
+    assert not legacy_task_records_exist()
+
+
+@pytest.mark.django_db
+def test_export_legacy_task_records_removed():
+    stdout = StringIO()
+    call_command("export_legacy_task_records", stdout=stdout)
+
+    assert "The legacy task record tables have been removed." in stdout.getvalue()
@@ -0,0 +1,63 @@
+import pytest
+
+from django_workflow_engine.tests.factories import UserFactory
+from django_workflow_engine.tests.workflows import linear_workflow
+
+BEFORE_TASK_STATUSES = ("django_workflow_engine", "0010_create_replacement_task_record")
+TASK_STATUSES = ("django_workflow_engine", "0011_migrate_from_taskrecordexecutions")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migrate_from_taskrecordexecutions(settings, migrate):
+    settings.DJANGO_WORKFLOWS = {"test_workflow": linear_workflow}
+
+    old_apps = migrate(BEFORE_TASK_STATUSES)
+    Flow = old_apps.get_model("django_workflow_engine", "Flow")
+    TaskRecordExecution = old_apps.get_model(
+        "django_workflow_engine", "TaskRecordExecution"
+    )
+    TaskRecordExecutionTarget = old_apps.get_model(
+        "django_workflow_engine", "TaskRecordExecutionTarget"
+    )
+    TaskRecordExecutionTaskLog = old_apps.get_model(
+        "django_workflow_engine", "TaskRecordExecutionTaskLog"
+    )
+
+    user = UserFactory()
+    flows = [
+        Flow.objects.create(
+            workflow_name="test_workflow", flow_name=f"flow_{i}", executed_by_id=user.pk
+        )
+        for i in range(3)
+    ]
+    step_ids = [step.step_id for step in linear_workflow.steps]
+    for flow in flows:
+        for step_id in step_ids + ["removed_step"]:
+            for done in [False, True]:
+                task_record = TaskRecordExecution.objects.create(
+                    flow=flow, step_id=step_id, task_name="basic_task", done=done
+                )
+                TaskRecordExecutionTarget.objects.create(
+                    task_record=task_record, target_string=f"{step_id}_{done}"
+                )
+                TaskRecordExecutionTaskLog.objects.create(
+                    task_record=task_record, message=f"{step_id} {done}"
+                )
+
+    new_apps = migrate(TASK_STATUSES)
+    TaskStatus = new_apps.get_model("django_workflow_engine", "TaskStatus")
+    Target = new_apps.get_model("django_workflow_engine", "Target")
+    TaskLog = new_apps.get_model("django_workflow_engine", "TaskLog")
+
+    for flow in flows:
+        task_statuses = TaskStatus.objects.filter(flow_id=flow.pk).order_by("pk")
+        # Only the latest execution of the steps still in the workflow.
+        assert [task_status.step_id for task_status in task_statuses] == step_ids
+        assert all(task_status.done for task_status in task_statuses)
+
+    assert set(Target.objects.values_list("task_status__step_id", "target_string")) == {
+        (step_id, f"{step_id}_True") for step_id in step_ids
+    }
+    assert set(TaskLog.objects.values_list("task_status__step_id", "message")) == {
+        (step_id, f"{step_id} True") for step_id in step_ids
+    }
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.utils import timezone
+
+from django_workflow_engine.archive import delete_flows
+from django_workflow_engine.executor import WorkflowExecutor
+from django_workflow_engine.models import Flow, OutboxEmail
+from django_workflow_engine.outbox import deliver_outbox
+from django_workflow_engine.tests.factories import UserFactory
+from django_workflow_engine.tests.workflows import send_email_workflow
+
+TEMPLATES = [{"BACKEND": "django.template.backends.django.DjangoTemplates"}]
+
+
+@pytest.fixture
+def outbox_settings(settings):
+    settings.TEMPLATES = TEMPLATES
+    settings.DJANGO_WORKFLOWS = {"send_email_workflow": send_email_workflow}
+    settings.DJANGO_WORKFLOW_EMAIL_OUTBOX = True
+    return settings
+
+
+def run_flows(*flow_names):
+    user = UserFactory()
+    for flow_name in flow_names:
+        flow = Flow.objects.create(
+            workflow_name="send_email_workflow", flow_name=flow_name, executed_by=user
+        )
+        WorkflowExecutor(flow).run_flow(user=user)
+
+
+@pytest.mark.django_db
+def test_send_email_queues_email(outbox_settings):
+    run_flows("a")
+
+    assert not mail.outbox
+    email = OutboxEmail.objects.get()
+    assert email.task_status.step_id == "send_email"
+    assert email.task_status.done
+    assert email.subject == "Hello"
+    assert email.message == "Hello a"
+    assert email.recipient_list == ["to@example.com"]
+    assert email.sent_at is None
+
+
+@pytest.mark.django_db
+def test_deliver_workflow_emails_command(outbox_settings):
+    run_flows("a", "b", "c")
+
+    with mock.patch(
+        "django_workflow_engine.outbox.get_connection", wraps=get_connection
+    ) as mock_get_connection:
+        call_command(
+            "deliver_workflow_emails", "--once", "--batch-size=2", stdout=StringIO()
+        )
+
+    # A connection per batch.
+    assert mock_get_connection.call_count == 2
+    assert sorted(email.body for email in mail.outbox) == [
+        "Hello a",
+        "Hello b",
+        "Hello c",
+    ]
+    assert not OutboxEmail.objects.filter(sent_at__isnull=True).exists()
+    assert deliver_outbox() == (0, 0)
+
+
+@pytest.mark.django_db
+def test_deliver_outbox_retries_failed_emails(outbox_settings):
+    run_flows("a", "b")
+    failing = OutboxEmail.objects.get(message="Hello a")
+
+    def send_messages(self, messages):
+        if messages[0].body == "Hello a":
+            raise ConnectionError("Connection refused")
+        mail.outbox.extend(messages)
+        return len(messages)
+
+    with mock.patch(
+        "django.core.mail.backends.locmem.EmailBackend.send_messages", send_messages
+    ):
+        assert deliver_outbox() == (1, 1)
+
+    assert [email.body for email in mail.outbox] == ["Hello b"]
+    failing.refresh_from_db()
+    assert failing.sent_at is None
+    assert failing.attempts == 1
+    assert "Connection refused" in failing.last_error
+    assert failing.send_after > timezone.now()
+
+    # Not retried until its backoff has passed.
+    assert deliver_outbox() == (0, 0)
+    OutboxEmail.objects.update(send_after=timezone.now() - timedelta(seconds=1))
+    assert deliver_outbox() == (1, 0)
+    assert [email.body for email in mail.outbox] == ["Hello b", "Hello a"]
+
+
+@pytest.mark.django_db
+def test_deliver_outbox_gives_up_after_max_attempts(outbox_settings):
+    run_flows("a")
+    OutboxEmail.objects.update(attempts=3)
+
+    assert deliver_outbox(max_attempts=3) == (0, 0)
+    assert deliver_outbox(max_attempts=4) == (1, 0)
+
+
+@pytest.mark.django_db
+def test_send_email_sends_without_outbox(outbox_settings):
+    outbox_settings.DJANGO_WORKFLOW_EMAIL_OUTBOX = False
+    run_flows("a")
+
+    assert [email.body for email in mail.outbox] == ["Hello a"]
+    assert not OutboxEmail.objects.exists()
+
+
+@pytest.mark.django_db
+def test_delete_flows_keeps_outbox_emails(outbox_settings):
+    run_flows("a")
+
+    delete_flows(list(Flow.objects.values_list("pk", flat=True)))
+
+    assert not Flow.objects.exists()
+    assert OutboxEmail.objects.get().task_status is None
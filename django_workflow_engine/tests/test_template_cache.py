@@ -0,0 +1,67 @@
+import pytest
+from django.core import mail
+
+from django_workflow_engine.executor import WorkflowExecutor
+from django_workflow_engine.models import Flow
+from django_workflow_engine.template_cache import (
+    clear_template_cache,
+    get_template,
+    template_cache_info,
+)
+from django_workflow_engine.tests.factories import UserFactory
+from django_workflow_engine.tests.workflows import send_email_workflow
+
+TEMPLATES = [{"BACKEND": "django.template.backends.django.DjangoTemplates"}]
+
+
+@pytest.fixture(autouse=True)
+def templates(settings):
+    settings.TEMPLATES = TEMPLATES
+    clear_template_cache()
+
+
+def test_get_template_is_cached():
+    template = get_template("Hello {{ name }}")
+
+    assert get_template("Hello {{ name }}") is template
+    assert get_template("Bye {{ name }}") is not template
+    assert template_cache_info() == (1, 2, 256, 2)
+
+
+def test_template_cache_is_bounded(settings):
+    settings.DJANGO_WORKFLOW_TEMPLATE_CACHE_SIZE = 2
+    first = get_template("1")
+    get_template("2")
+    get_template("1")
+    get_template("3")
+
+    # "2" was the least recently used.
+    assert get_template("1") is first
+    assert template_cache_info().currsize == 2
+    get_template("2")
+    assert template_cache_info().misses == 4
+
+
+def test_template_cache_cleared_on_setting_change(settings):
+    get_template("Hello")
+
+    settings.TEMPLATES = TEMPLATES + [
+        {"BACKEND": "django.template.backends.django.DjangoTemplates", "NAME": "b"}
+    ]
+
+    assert template_cache_info() == (0, 0, 256, 0)
+
+
+@pytest.mark.django_db
+def test_send_email_uses_template_cache(settings):
+    settings.DJANGO_WORKFLOWS = {"send_email_workflow": send_email_workflow}
+    user = UserFactory()
+
+    for flow_name in ["a", "b"]:
+        flow = Flow.objects.create(
+            workflow_name="send_email_workflow", flow_name=flow_name, executed_by=user
+        )
+        WorkflowExecutor(flow).run_flow(user=user)
+
+    assert [email.body for email in mail.outbox] == ["Hello a", "Hello b"]
+    assert template_cache_info()[:2] == (1, 1)
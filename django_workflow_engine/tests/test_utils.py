@@ -0,0 +1,54 @@
+from unittest import mock
+
+import pytest
+
+from django_workflow_engine.exceptions import WorkflowImproperlyConfigured
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import linear_workflow, split_workflow
+from django_workflow_engine.utils import lookup_workflow
+
+
+@mock.patch(
+    "django_workflow_engine.utils.import_string", return_value=linear_workflow
+)
+def test_lookup_workflow_imports_once(mock_import_string, settings):
+    settings.DJANGO_WORKFLOWS = {
+        "test_workflow": "django_workflow_engine.tests.workflows.linear_workflow",
+    }
+
+    assert lookup_workflow("test_workflow") is linear_workflow
+    assert lookup_workflow("test_workflow") is linear_workflow
+    mock_import_string.assert_called_once()
+
+
+def test_lookup_workflow_after_settings_change(settings):
+    settings.DJANGO_WORKFLOWS = {"test_workflow": linear_workflow}
+    assert lookup_workflow("test_workflow") is linear_workflow
+
+    settings.DJANGO_WORKFLOWS = {"test_workflow": split_workflow}
+    assert lookup_workflow("test_workflow") is split_workflow
+
+
+def test_lookup_missing_workflow(settings):
+    settings.DJANGO_WORKFLOWS = {"test_workflow": linear_workflow}
+
+    with pytest.raises(WorkflowImproperlyConfigured, match="not_a_workflow"):
+        lookup_workflow("not_a_workflow")
+
+
+@pytest.mark.django_db
+def test_flow_workflow_is_memoized(settings):
+    flow, executor, test_user = set_up_flow(settings, linear_workflow)
+    assert flow.workflow is linear_workflow
+
+    with mock.patch("django_workflow_engine.models.lookup_workflow") as mock_lookup:
+        mock_lookup.return_value = linear_workflow
+        flow.workflow
+        flow.workflow
+
+    mock_lookup.assert_not_called()
+
+    flow.workflow_name = "other_workflow"
+    with mock.patch("django_workflow_engine.models.lookup_workflow") as mock_lookup:
+        mock_lookup.return_value = split_workflow
+        assert flow.workflow is split_workflow
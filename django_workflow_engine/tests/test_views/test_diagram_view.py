@@ -1,5 +1,86 @@
-"""
-TODO: Write tests
+import json
 
-This view should show the diagram for a given flow
-"""
+import pytest
+from django.test import RequestFactory
+
+from django_workflow_engine.models import TaskStatus
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import (
+    fan_out_workflow,
+    manual_task_workflow,
+)
+from django_workflow_engine.views import FlowDiagramView, workflow_to_cytoscape_elements
+
+
+@pytest.mark.django_db
+def test_diagram_view(settings):
+    flow, executor, test_user = set_up_flow(settings, manual_task_workflow)
+    executor.run_flow(user=test_user)
+
+    request = RequestFactory().get("/")
+    response = FlowDiagramView.as_view()(request, pk=flow.pk)
+
+    elements = json.loads(response.content)["elements"]
+    assert [
+        (node["data"]["id"], node["data"]["done"], node["data"]["current"])
+        for node in elements["nodes"]
+    ] == [
+        ("start", True, False),
+        ("manual", False, True),
+        ("end", False, False),
+    ]
+    assert [
+        (edge["data"]["source"], edge["data"]["target"]) for edge in elements["edges"]
+    ] == [("start", "manual"), ("manual", "end")]
+
+
+@pytest.mark.django_db
+def test_diagram_reset_step(settings):
+    flow, executor, test_user = set_up_flow(settings, manual_task_workflow)
+    executor.run_flow(user=test_user)
+
+    # The start step has been reset since it was executed.
+    TaskStatus.objects.filter(flow=flow, step_id="start").update(
+        done=False, executed_at=None
+    )
+
+    nodes = workflow_to_cytoscape_elements(flow)["nodes"]
+    assert nodes[0]["data"]["id"] == "start"
+    assert not nodes[0]["data"]["done"]
+    assert nodes[0]["data"]["current"]
+
+
+@pytest.mark.django_db
+def test_diagram_queries(settings, django_assert_num_queries):
+    flow, executor, test_user = set_up_flow(settings, fan_out_workflow)
+    executor.run_flow(user=test_user)
+    workflow_to_cytoscape_elements(flow)
+
+    with django_assert_num_queries(1):
+        elements = workflow_to_cytoscape_elements(flow)
+
+    assert len(elements["nodes"]) == len(fan_out_workflow.steps)
+    assert all(node["data"]["done"] for node in elements["nodes"])
+
+
+@pytest.mark.django_db
+def test_diagram_view_not_modified(settings, django_assert_num_queries):
+    flow, executor, test_user = set_up_flow(settings, manual_task_workflow)
+    executor.run_flow(user=test_user)
+
+    response = FlowDiagramView.as_view()(RequestFactory().get("/"), pk=flow.pk)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Last-Modified"]
+
+    request = RequestFactory().get("/", HTTP_IF_NONE_MATCH=etag)
+    with django_assert_num_queries(1):
+        response = FlowDiagramView.as_view()(request, pk=flow.pk)
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    TaskStatus.objects.filter(flow=flow, step_id="manual").update(done=True)
+
+    response = FlowDiagramView.as_view()(request, pk=flow.pk)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
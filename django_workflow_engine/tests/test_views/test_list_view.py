@@ -1,5 +1,51 @@
-"""
-TODO: Write tests
+import pytest
+from django.test import RequestFactory
 
-This view should list all of the Flows
-"""
+from django_workflow_engine.executor import WorkflowExecutor
+from django_workflow_engine.models import Flow
+from django_workflow_engine.tests.factories import UserFactory
+from django_workflow_engine.tests.workflows import (
+    linear_workflow,
+    manual_task_workflow,
+)
+from django_workflow_engine.views import FlowListView
+
+
+@pytest.mark.django_db
+def test_list_view_queries(settings, django_assert_num_queries):
+    settings.DJANGO_WORKFLOWS = {
+        "linear_workflow": linear_workflow,
+        "manual_task_workflow": manual_task_workflow,
+    }
+
+    for i in range(10):
+        user = UserFactory()
+        flow = Flow.objects.create(
+            workflow_name="manual_task_workflow" if i % 2 else "linear_workflow",
+            flow_name=f"flow_{i}",
+            executed_by=user,
+        )
+        WorkflowExecutor(flow).run_flow(user=user)
+
+    request = RequestFactory().get("/")
+    request.user = UserFactory()
+
+    # One query to count the flows for the paginator and one to fetch them.
+    with django_assert_num_queries(2):
+        response = FlowListView.as_view()(request)
+        rows = [
+            (
+                flow.flow_name,
+                str(flow.executed_by),
+                flow.on_manual_step,
+                flow.is_complete,
+            )
+            for flow in response.context_data["object_list"]
+        ]
+
+    assert len(rows) == 10
+    for flow_name, _, on_manual_step, is_complete in rows:
+        flow = Flow.objects.get(flow_name=flow_name)
+        assert on_manual_step == flow.on_manual_step
+        assert on_manual_step == (flow.workflow_name == "manual_task_workflow")
+        assert is_complete == (flow.workflow_name == "linear_workflow")
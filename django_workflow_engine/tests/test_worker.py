@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from django_workflow_engine.management.commands.run_workflow_worker import Command
+from django_workflow_engine.models import Flow
+from django_workflow_engine.tests.factories import UserFactory
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import (
+    manual_task_workflow,
+    pause_task_workflow,
+)
+from django_workflow_engine.worker import claim_runnable_flows
+
+
+@mock.patch("django_workflow_engine.tests.tasks.PauseTask.execute")
+@pytest.mark.django_db(transaction=True)
+def test_worker_runs_paused_flows(mock_execute, settings):
+    mock_execute.return_value = ([], False)
+    flow, executor, test_user = set_up_flow(settings, pause_task_workflow)
+    other_flow = Flow.objects.create(
+        workflow_name="test_workflow",
+        flow_name="other_flow",
+        executed_by=UserFactory(),
+    )
+    executor.run_flow(user=test_user)
+    Flow.objects.get(pk=other_flow.pk).acquire_lease("another-worker")
+
+    mock_execute.return_value = ([], True)
+    call_command("run_workflow_worker", "--once", "--workers=2")
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert not flow.running
+    # Never started and leased flows are left alone.
+    other_flow.refresh_from_db()
+    assert not other_flow.tasks.exists()
+    assert other_flow.lease_owner == "another-worker"
+
+
+@pytest.mark.django_db
+def test_flows_on_manual_steps_are_not_claimed(settings):
+    flow, executor, test_user = set_up_flow(settings, manual_task_workflow)
+    executor.run_flow(user=test_user)
+
+    assert claim_runnable_flows("worker-1", batch_size=10) == []
+
+
+@mock.patch("django_workflow_engine.tests.tasks.PauseTask.execute")
+@pytest.mark.django_db
+def test_flows_are_only_claimed_once(mock_execute, settings):
+    mock_execute.return_value = ([], False)
+    flow, executor, test_user = set_up_flow(settings, pause_task_workflow)
+    executor.run_flow(user=test_user)
+
+    assert claim_runnable_flows("worker-1", batch_size=10) == [flow.pk]
+    assert claim_runnable_flows("worker-2", batch_size=10) == []
+
+
+@mock.patch("django_workflow_engine.tests.tasks.PauseTask.execute")
+@pytest.mark.django_db(transaction=True)
+def test_worker_backs_off_flows_that_make_no_progress(mock_execute, settings):
+    mock_execute.return_value = ([], False)
+    flow, executor, test_user = set_up_flow(settings, pause_task_workflow)
+    executor.run_flow(user=test_user)
+    mock_execute.reset_mock()
+
+    command = Command(stdout=StringIO())
+    command.stopping = mock.Mock()
+    command.stopping.is_set.side_effect = [False, False, True]
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        command.run(pool, "worker-1", {"batch_size": 10, "interval": 5, "once": False})
+
+    # The paused flow was claimed twice, with a wait after each time.
+    assert mock_execute.call_count == 2
+    assert command.stopping.wait.call_args_list == [mock.call(5), mock.call(5)]
+
+
+@mock.patch("django_workflow_engine.tests.tasks.PauseTask.execute")
+@pytest.mark.django_db(transaction=True)
+def test_worker_runs_flows_in_processes(mock_execute, settings):
+    if connection.vendor == "sqlite" and connection.is_in_memory_db():
+        pytest.skip("Processes can't share an in-memory database")
+
+    mock_execute.return_value = ([], True)
+    flows = []
+    for i in range(4):
+        flow, executor, test_user = set_up_flow(settings, pause_task_workflow)
+        mock_execute.return_value = ([], False)
+        executor.run_flow(user=test_user)
+        flows.append(flow)
+    mock_execute.return_value = ([], True)
+
+    call_command(
+        "run_workflow_worker",
+        "--once",
+        "--workers=2",
+        "--pool=process",
+        stdout=StringIO(),
+    )
+
+    for flow in flows:
+        flow.refresh_from_db()
+        assert flow.is_complete
+        assert not flow.running
+    # The parent's connection still works after the processes have run.
+    assert Flow.objects.count() == 4
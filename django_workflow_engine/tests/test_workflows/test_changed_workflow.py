@@ -0,0 +1,52 @@
+import pytest
+
+from django_workflow_engine import COMPLETE
+from django_workflow_engine.dataclass import Step, Workflow
+from django_workflow_engine.executor import WorkflowExecutor
+from django_workflow_engine.models import Flow, TaskStatus
+from django_workflow_engine.tests.tasks import BasicTask
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import manual_task_workflow
+
+automated_workflow = Workflow(
+    name="manual_task_workflow",
+    steps=[
+        Step(
+            step_id="start",
+            task_name=BasicTask.task_name,
+            start=True,
+            targets=["manual"],
+        ),
+        Step(
+            step_id="manual",
+            task_name=BasicTask.task_name,
+            targets=["end"],
+        ),
+        Step(
+            step_id="end",
+            task_name=BasicTask.task_name,
+            targets=COMPLETE,
+        ),
+    ],
+)
+
+
+@pytest.mark.django_db
+def test_step_task_changed(settings):
+    """
+    A flow keeps one TaskStatus per step when the task of a step changes.
+    """
+    flow, executor, test_user = set_up_flow(settings, manual_task_workflow)
+    executor.run_flow(user=test_user)
+    assert not flow.is_complete
+
+    settings.DJANGO_WORKFLOWS = {"test_workflow": automated_workflow}
+    flow = Flow.objects.get(pk=flow.pk)
+    WorkflowExecutor(flow).run_flow(user=test_user)
+
+    assert flow.is_complete
+    assert list(TaskStatus.objects.values_list("step_id", "task_name")) == [
+        ("start", BasicTask.task_name),
+        ("manual", BasicTask.task_name),
+        ("end", BasicTask.task_name),
+    ]
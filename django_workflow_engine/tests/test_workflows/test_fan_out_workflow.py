@@ -0,0 +1,26 @@
+import pytest
+
+from django_workflow_engine.models import Target, TaskStatus
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import fan_out_workflow
+
+
+@pytest.mark.django_db
+def test_fan_out_workflow(settings, django_assert_max_num_queries):
+    flow, executor, test_user = set_up_flow(
+        settings,
+        fan_out_workflow,
+    )
+
+    # The 20 targets of "start" are saved in bulk, after that each task only
+    # saves its own result.
+    with django_assert_max_num_queries(35):
+        executor.run_flow(user=test_user)
+
+    assert flow.is_complete
+    assert TaskStatus.objects.filter(done=True).count() == 21
+    assert Target.objects.count() == 20
+    assert [task_status.step_id for task_status in TaskStatus.objects.all()] == [
+        "start",
+        *[f"task_{i}" for i in range(20)],
+    ]
@@ -0,0 +1,208 @@
+from dataclasses import replace
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from django_workflow_engine import COMPLETE
+from django_workflow_engine.async_executor import AsyncWorkflowExecutor
+from django_workflow_engine.dataclass import Step, Workflow
+from django_workflow_engine.models import JoinBarrier, TaskLog, TaskStatus
+from django_workflow_engine.tests.tasks import BasicTask, DecisionTask, LogTask
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import split_and_join_workflow
+
+
+def build_join_workflow(barrier: bool) -> Workflow:
+    # "short" reaches the join a wave before "long_2" does.
+    return Workflow(
+        name="join_workflow",
+        steps=[
+            Step(
+                step_id="start",
+                task_name=BasicTask.task_name,
+                start=True,
+                targets=["short", "long_1"],
+            ),
+            Step(step_id="short", task_name=BasicTask.task_name, targets=["join"]),
+            Step(step_id="long_1", task_name=BasicTask.task_name, targets=["long_2"]),
+            Step(step_id="long_2", task_name=BasicTask.task_name, targets=["join"]),
+            Step(
+                step_id="join",
+                task_name=LogTask.task_name,
+                targets=COMPLETE,
+                task_info={"messages": 1},
+                barrier=barrier,
+            ),
+        ],
+    )
+
+
+def join_executions(flow) -> int:
+    return TaskLog.objects.filter(task_status__flow=flow).count()
+
+
+@pytest.mark.django_db
+def test_join_without_barrier_runs_per_branch(settings):
+    flow, executor, test_user = set_up_flow(settings, build_join_workflow(False))
+
+    executor.run_flow(user=test_user)
+
+    assert join_executions(flow) == 2
+
+
+@pytest.mark.django_db
+def test_join_barrier(settings):
+    flow, executor, test_user = set_up_flow(settings, build_join_workflow(True))
+    workflow = flow.workflow
+
+    for step_id in ["start", "short"]:
+        executor.execute_step(user=test_user, step=workflow.get_step(step_id))
+
+    assert not flow.tasks.filter(step_id="join").exists()
+    assert JoinBarrier.objects.get(flow=flow, step_id="join").arrived == ["short"]
+
+    executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert join_executions(flow) == 1
+    assert not JoinBarrier.objects.exists()
+
+
+@pytest.mark.django_db
+def test_join_barrier_counts_predecessors_once(settings):
+    flow, executor, test_user = set_up_flow(settings, build_join_workflow(True))
+    workflow = flow.workflow
+
+    # "short" arriving again, e.g. round a loop, doesn't stand in for "long_2".
+    for step_id in ["start", "short", "short"]:
+        executor.execute_step(user=test_user, step=workflow.get_step(step_id))
+
+    assert not flow.tasks.filter(step_id="join").exists()
+    assert JoinBarrier.objects.get(flow=flow, step_id="join").arrived == ["short"]
+
+    executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert join_executions(flow) == 1
+
+
+@pytest.mark.django_db
+def test_join_barrier_skips_untaken_branches(settings):
+    workflow = Workflow(
+        name="decision_join_workflow",
+        steps=[
+            Step(
+                step_id="start",
+                task_name=BasicTask.task_name,
+                start=True,
+                targets=["decision", "other"],
+            ),
+            Step(
+                step_id="decision",
+                task_name=DecisionTask.task_name,
+                targets=["chosen", "not_chosen"],
+                task_info={"choice": ["chosen"]},
+            ),
+            Step(step_id="chosen", task_name=BasicTask.task_name, targets=["join"]),
+            Step(step_id="not_chosen", task_name=BasicTask.task_name, targets=["join"]),
+            Step(step_id="other", task_name=BasicTask.task_name, targets=["join"]),
+            Step(
+                step_id="join",
+                task_name=LogTask.task_name,
+                targets=COMPLETE,
+                task_info={"messages": 1},
+                barrier=True,
+            ),
+        ],
+    )
+    flow, executor, test_user = set_up_flow(settings, workflow)
+
+    executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert join_executions(flow) == 1
+    assert not flow.tasks.filter(step_id="not_chosen").exists()
+    assert not JoinBarrier.objects.exists()
+
+
+@pytest.mark.django_db
+def test_join_barrier_parallel(settings):
+    flow, executor, test_user = set_up_flow(settings, build_join_workflow(True))
+    executor.parallel_workers = 2
+
+    executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert join_executions(flow) == 1
+    assert not JoinBarrier.objects.exists()
+
+
+@pytest.mark.django_db
+def test_join_barrier_arrivals_in_one_wave(settings):
+    workflow = replace(
+        split_and_join_workflow,
+        steps=[
+            replace(step, barrier=step.step_id == "task_c")
+            for step in split_and_join_workflow.steps
+        ],
+    )
+    flow, executor, test_user = set_up_flow(settings, workflow)
+
+    executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert TaskStatus.objects.filter(flow=flow, done=True).count() == 4
+    # Both branches arrived in the same wave, no barrier was needed.
+    assert not JoinBarrier.objects.exists()
+
+
+@pytest.mark.django_db
+def test_join_barrier_only_checked_on_arrival(settings):
+    workflow = build_join_workflow(True)
+    workflow = replace(
+        workflow,
+        steps=[
+            replace(step, targets=["long_3"]) if step.step_id == "long_2" else step
+            for step in workflow.steps
+        ]
+        + [
+            Step(step_id="long_3", task_name=BasicTask.task_name, targets=["long_4"]),
+            Step(step_id="long_4", task_name=BasicTask.task_name, targets=["join"]),
+        ],
+    )
+    flow, executor, test_user = set_up_flow(settings, workflow)
+
+    with CaptureQueriesContext(connection) as context:
+        executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert join_executions(flow) == 1
+    # The barrier is looked up when "short" arrives and when "long_4" does,
+    # not in the waves of "long_2" and "long_3" in between.
+    barrier_lookups = [
+        query["sql"]
+        for query in context.captured_queries
+        if query["sql"].startswith("SELECT")
+        and JoinBarrier._meta.db_table in query["sql"]
+    ]
+    assert len(barrier_lookups) == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_join_barrier_async(settings):
+    flow, _, test_user = set_up_flow(settings, build_join_workflow(True))
+
+    async_to_sync(AsyncWorkflowExecutor(flow).arun_flow)(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert join_executions(flow) == 1
+    assert not JoinBarrier.objects.exists()
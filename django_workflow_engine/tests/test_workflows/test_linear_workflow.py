@@ -1,6 +1,11 @@
+import sys
+
 import pytest
 
+from django_workflow_engine import COMPLETE
+from django_workflow_engine.dataclass import Step, Workflow
 from django_workflow_engine.models import TaskStatus
+from django_workflow_engine.tests.tasks import BasicTask
 from django_workflow_engine.tests.utils import set_up_flow
 from django_workflow_engine.tests.workflows import linear_workflow
 
@@ -45,3 +50,33 @@ def test_with_error_workflow(settings):
 
     task_order = [task_status.step_id for task_status in TaskStatus.objects.all()]
     assert task_order == correct_task_order
+
+
+@pytest.mark.django_db
+def test_long_workflow(settings):
+    """
+    Steps are executed in a loop, so long workflows don't hit the recursion limit.
+    """
+    step_count = sys.getrecursionlimit() + 100
+    long_workflow = Workflow(
+        name="long_workflow",
+        steps=[
+            Step(
+                step_id=f"task_{i}",
+                task_name=BasicTask.task_name,
+                start=i == 0,
+                targets=[f"task_{i + 1}"] if i + 1 < step_count else COMPLETE,
+            )
+            for i in range(step_count)
+        ],
+    )
+
+    flow, executor, test_user = set_up_flow(
+        settings,
+        long_workflow,
+    )
+    executor.run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert TaskStatus.objects.filter(done=True).count() == step_count
@@ -2,7 +2,8 @@ from typing import Any
 
 import pytest
 
-from django_workflow_engine.dataclass import Workflow
+from django_workflow_engine import COMPLETE
+from django_workflow_engine.dataclass import Step, Workflow
 from django_workflow_engine.tests.utils import set_up_flow
 from django_workflow_engine.tests.workflows import (
     complex_loops_workflow,
@@ -106,3 +107,75 @@ def test_complex_loops_workflow(settings: Any):
     assert workflow.step_last_in_loop("task_c") == True
     assert workflow.step_last_in_loop("task_b_notify_creator") == False
     assert workflow.step_last_in_loop("end") == False
+
+
+def test_long_workflow_loops():
+    """
+    Loop analysis doesn't recurse per step, so long workflows are fine.
+    """
+    steps = [Step(step_id="start", task_name="basic_task", start=True, targets=["d0"])]
+    for i in range(1500):
+        next_step_id = f"d{i + 1}" if i < 1499 else "end"
+        steps += [
+            Step(
+                step_id=f"d{i}",
+                task_name="basic_task",
+                targets=[f"remind{i}", next_step_id],
+            ),
+            Step(step_id=f"remind{i}", task_name="basic_task", targets=[f"d{i}"]),
+        ]
+    steps.append(Step(step_id="end", task_name="basic_task", targets=COMPLETE))
+    workflow = Workflow(name="long_workflow", steps=steps)
+
+    loops = workflow.get_loops()
+    assert len(loops) == 1500
+    assert loops[0] == ["d0", "remind0"]
+    assert loops[-1] == ["d1499", "remind1499"]
+    assert workflow.step_last_in_loop("remind750") == True
+    assert workflow.step_last_in_loop("d750") == False
+
+
+def test_loop_after_join_is_reported_once():
+    workflow = Workflow(
+        name="loop_after_join",
+        steps=[
+            Step(
+                step_id="start",
+                task_name="basic_task",
+                start=True,
+                targets=["task_a", "task_b"],
+            ),
+            Step(step_id="task_a", task_name="basic_task", targets=["join"]),
+            Step(step_id="task_b", task_name="basic_task", targets=["join"]),
+            Step(step_id="join", task_name="basic_task", targets=["remind", "end"]),
+            Step(step_id="remind", task_name="basic_task", targets=["join"]),
+            Step(step_id="end", task_name="basic_task", targets=COMPLETE),
+        ],
+    )
+
+    assert workflow.get_loops() == [["join", "remind"]]
+
+
+def test_loop_entered_from_two_branches():
+    """
+    A loop that can be entered at either step is closed by either step.
+    """
+    workflow = Workflow(
+        name="two_entry_loop",
+        steps=[
+            Step(
+                step_id="start",
+                task_name="basic_task",
+                start=True,
+                targets=["task_a", "task_b"],
+            ),
+            Step(step_id="task_a", task_name="basic_task", targets=["loop_x"]),
+            Step(step_id="task_b", task_name="basic_task", targets=["loop_y"]),
+            Step(step_id="loop_x", task_name="basic_task", targets=["loop_y"]),
+            Step(step_id="loop_y", task_name="basic_task", targets=["loop_x"]),
+        ],
+    )
+
+    assert workflow.get_loops() == [["loop_x", "loop_y"], ["loop_y", "loop_x"]]
+    assert workflow.step_last_in_loop("loop_x") == True
+    assert workflow.step_last_in_loop("loop_y") == True
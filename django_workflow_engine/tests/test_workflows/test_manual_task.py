@@ -0,0 +1,24 @@
+import pytest
+
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import manual_task_workflow
+
+
+@pytest.mark.django_db
+def test_manual_task_workflow(settings):
+    flow, executor, test_user = set_up_flow(
+        settings,
+        manual_task_workflow,
+    )
+
+    executor.run_flow(user=test_user)
+
+    assert not flow.is_complete
+    assert flow.on_manual_step
+    assert flow.tasks.count() == 2
+    assert [step.step_id for step in executor.get_current_steps()] == ["manual"]
+
+    executor.execute_step(
+        user=test_user, step=manual_task_workflow.get_step("manual")
+    )
+    assert [step.step_id for step in executor.get_current_steps()] == ["manual"]
@@ -0,0 +1,121 @@
+import time
+from typing import List
+from unittest import mock
+
+import pytest
+from django.db import transaction
+
+from django_workflow_engine import COMPLETE
+from django_workflow_engine.dataclass import Step, Workflow
+from django_workflow_engine.executor import WorkflowExecutor
+from django_workflow_engine.models import Flow, TaskStatus
+from django_workflow_engine.tests.tasks import BasicTask, ErrorTask, SleepTask
+from django_workflow_engine.tests.utils import set_up_flow
+
+
+def build_branches_workflow(
+    branch_task_names: List[str], no_parallel: bool = False
+) -> Workflow:
+    branch_step_ids = [f"branch_{i}" for i in range(len(branch_task_names))]
+
+    return Workflow(
+        name="branches_workflow",
+        steps=[
+            Step(
+                step_id="start",
+                task_name=BasicTask.task_name,
+                start=True,
+                targets=branch_step_ids,
+            ),
+            *[
+                Step(
+                    step_id=step_id,
+                    task_name=task_name,
+                    targets=[f"finish_{step_id}"],
+                    no_parallel=no_parallel,
+                )
+                for step_id, task_name in zip(branch_step_ids, branch_task_names)
+            ],
+            *[
+                Step(
+                    step_id=f"finish_{step_id}",
+                    task_name=BasicTask.task_name,
+                    targets=COMPLETE,
+                )
+                for step_id in branch_step_ids
+            ],
+        ],
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_branches(settings):
+    workflow = build_branches_workflow([SleepTask.task_name] * 3)
+    flow, _, test_user = set_up_flow(settings, workflow)
+    executor = WorkflowExecutor(flow, parallel_workers=3)
+
+    started = time.monotonic()
+    executor.run_flow(user=test_user)
+
+    assert time.monotonic() - started < SleepTask.seconds * 2
+    flow.refresh_from_db()
+    assert flow.is_complete
+    assert [task_status.step_id for task_status in TaskStatus.objects.all()] == [
+        "start",
+        "branch_0",
+        "branch_1",
+        "branch_2",
+        "finish_branch_0",
+        "finish_branch_1",
+        "finish_branch_2",
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_branches_opt_out(settings):
+    workflow = build_branches_workflow([SleepTask.task_name] * 2, no_parallel=True)
+    flow, _, test_user = set_up_flow(settings, workflow)
+    executor = WorkflowExecutor(flow, parallel_workers=2)
+
+    started = time.monotonic()
+    executor.run_flow(user=test_user)
+
+    assert time.monotonic() - started >= SleepTask.seconds * 2
+    flow.refresh_from_db()
+    assert flow.is_complete
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_branches_with_error(settings):
+    settings.DJANGO_WORKFLOW_PARALLEL_WORKERS = 2
+    workflow = build_branches_workflow([ErrorTask.task_name, BasicTask.task_name])
+    flow, executor, test_user = set_up_flow(settings, workflow)
+
+    executor.run_flow(user=test_user)
+    executor.run_flow(user=test_user)
+
+    assert executor.parallel_workers == 2
+    assert not flow.is_complete
+    assert TaskStatus.objects.filter(done=True).count() == 3
+    assert not TaskStatus.objects.get(step_id="branch_0").done
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_branches_in_transaction(settings):
+    workflow = build_branches_workflow([BasicTask.task_name] * 2)
+    flow, _, test_user = set_up_flow(settings, workflow)
+
+    # The pool's threads couldn't see the flow created in this transaction.
+    with transaction.atomic(), mock.patch(
+        "django_workflow_engine.executor.ThreadPoolExecutor"
+    ) as mock_pool:
+        flow = Flow.objects.create(
+            workflow_name=flow.workflow_name,
+            flow_name="In a transaction",
+            executed_by=test_user,
+        )
+        WorkflowExecutor(flow, parallel_workers=2).run_flow(user=test_user)
+
+    mock_pool.assert_not_called()
+    flow.refresh_from_db()
+    assert flow.is_complete
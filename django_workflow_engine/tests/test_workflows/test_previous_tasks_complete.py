@@ -2,6 +2,12 @@ from unittest import mock
 
 import pytest
 
+from django_workflow_engine import COMPLETE
+from django_workflow_engine.dataclass import Step, Workflow
+from django_workflow_engine.models import TaskStatus
+from django_workflow_engine.tasks.previous_tasks_complete import (
+    PreviousTasksCompleteTask,
+)
 from django_workflow_engine.tests.tasks import BasicTask
 from django_workflow_engine.tests.utils import set_up_flow
 from django_workflow_engine.tests.workflows import (
@@ -97,3 +103,57 @@ def test_previous_tasks_complete_failure_workflow(mock_execute, settings):
     assert flow.tasks.count() == 4
     end_task = flow.tasks.filter(step_id="task_c").last()
     assert end_task.done
+
+
+wide_join_workflow = Workflow(
+    name="wide_join_workflow",
+    steps=[
+        Step(
+            step_id="start",
+            task_name=BasicTask.task_name,
+            start=True,
+            targets=[f"branch_{i}" for i in range(30)],
+        ),
+        *[
+            Step(
+                step_id=f"branch_{i}",
+                task_name=BasicTask.task_name,
+                targets=["join"],
+            )
+            for i in range(30)
+        ],
+        Step(
+            step_id="join",
+            task_name=PreviousTasksCompleteTask.task_name,
+            targets=COMPLETE,
+        ),
+    ],
+)
+
+
+@pytest.mark.django_db
+def test_previous_tasks_complete_wide_join(settings, django_assert_num_queries):
+    flow, executor, test_user = set_up_flow(settings, wide_join_workflow)
+    TaskStatus.objects.bulk_create(
+        [
+            TaskStatus(
+                flow=flow,
+                step_id=f"branch_{i}",
+                task_name=BasicTask.task_name,
+                done=i != 29,
+            )
+            for i in range(30)
+        ]
+    )
+    join_status = TaskStatus.objects.create(
+        flow=flow, step_id="join", task_name=PreviousTasksCompleteTask.task_name
+    )
+    task = PreviousTasksCompleteTask(test_user, join_status, flow)
+
+    with django_assert_num_queries(1):
+        assert task.execute({}) == ([], False)
+
+    TaskStatus.objects.filter(flow=flow, step_id="branch_29").update(done=True)
+
+    with django_assert_num_queries(1):
+        assert task.execute({}) == ([], True)
@@ -27,6 +27,20 @@ def test_parallel_path_no_join_workflow(settings):
     assert task_order == correct_task_order
 
 
+@pytest.mark.django_db()
+def test_parallel_path_no_join_query_count(settings, django_assert_max_num_queries):
+    flow, executor, test_user = set_up_flow(
+        settings,
+        split_workflow,
+    )
+
+    # Each wave's changes are saved with a check that the lease is still held.
+    with django_assert_max_num_queries(26):
+        executor.run_flow(user=test_user)
+
+    assert flow.is_complete
+
+
 @pytest.mark.django_db()
 def test_parallel_path_no_join_with_error_workflow(settings):
     split_workflow.steps[1].task_name = "error_task"
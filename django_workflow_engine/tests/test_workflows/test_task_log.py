@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from django_workflow_engine import COMPLETE
+from django_workflow_engine.dataclass import Step, Workflow
+from django_workflow_engine.models import TaskLog
+from django_workflow_engine.tests.tasks import BasicTask, LogTask
+from django_workflow_engine.tests.utils import set_up_flow
+
+
+def build_log_workflow(**log_step_kwargs) -> Workflow:
+    return Workflow(
+        name="log_workflow",
+        steps=[
+            Step(
+                step_id="start",
+                task_name=BasicTask.task_name,
+                start=True,
+                targets=["log_a", "log_b"],
+            ),
+            Step(
+                step_id="log_a",
+                task_name=LogTask.task_name,
+                targets=COMPLETE,
+                **log_step_kwargs,
+            ),
+            Step(
+                step_id="log_b",
+                task_name=LogTask.task_name,
+                targets=COMPLETE,
+                **log_step_kwargs,
+            ),
+        ],
+    )
+
+
+@pytest.mark.django_db
+def test_task_log_is_saved_in_bulk(settings):
+    flow, executor, test_user = set_up_flow(settings, build_log_workflow())
+
+    with CaptureQueriesContext(connection) as queries:
+        executor.run_flow(user=test_user)
+
+    assert flow.is_complete
+    assert [
+        (task_log.task_status.step_id, task_log.message)
+        for task_log in TaskLog.objects.order_by("pk")
+    ] == [
+        ("log_a", "Message 0"),
+        ("log_a", "Message 1"),
+        ("log_a", "Message 2"),
+        ("log_b", "Message 0"),
+        ("log_b", "Message 1"),
+        ("log_b", "Message 2"),
+    ]
+    log_inserts = [
+        query
+        for query in queries.captured_queries
+        if query["sql"].startswith('INSERT INTO "django_workflow_engine_tasklog"')
+    ]
+    assert len(log_inserts) == 1
+
+
+@pytest.mark.django_db
+def test_task_log_is_saved_on_error(settings):
+    flow, executor, test_user = set_up_flow(
+        settings, build_log_workflow(task_info={"error": True})
+    )
+
+    executor.run_flow(user=test_user)
+
+    assert not flow.is_complete
+    assert TaskLog.objects.count() == 6
+
+
+@pytest.mark.django_db
+def test_no_log_step(settings):
+    flow, executor, test_user = set_up_flow(settings, build_log_workflow(no_log=True))
+
+    executor.run_flow(user=test_user)
+
+    assert flow.is_complete
+    assert not TaskLog.objects.exists()
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+
+from django_workflow_engine.async_executor import AsyncWorkflowExecutor
+from django_workflow_engine.executor import WorkflowExecutor
+from django_workflow_engine.tests.tasks import WaitTask
+from django_workflow_engine.tests.utils import set_up_flow
+from django_workflow_engine.tests.workflows import wait_workflow
+from django_workflow_engine.worker import claim_runnable_flows
+
+
+def make_due(flow):
+    flow.tasks.filter(step_id="wait").update(
+        run_after=timezone.now() - timedelta(seconds=1)
+    )
+
+
+@pytest.mark.django_db
+def test_wait_workflow(settings):
+    flow, executor, test_user = set_up_flow(settings, wait_workflow)
+
+    executor.run_flow(user=test_user)
+
+    wait = flow.tasks.get(step_id="wait")
+    assert wait.executed_at is None
+    assert not wait.done
+    assert wait.run_after > timezone.now()
+    flow.refresh_from_db()
+    assert not flow.is_complete
+    assert not flow.finished
+
+    # The step isn't executed again before it is due.
+    with mock.patch.object(WaitTask, "execute") as mock_execute:
+        WorkflowExecutor(flow).run_flow(user=test_user)
+    mock_execute.assert_not_called()
+    assert claim_runnable_flows("worker", 10) == []
+
+    make_due(flow)
+    assert claim_runnable_flows("worker", 10) == [flow.pk]
+    flow.release_lease("worker")
+
+    WorkflowExecutor(flow).run_flow(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
+    wait = flow.tasks.get(step_id="wait")
+    assert wait.done
+    assert wait.run_after is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_wait_workflow_async(settings):
+    flow, _, test_user = set_up_flow(settings, wait_workflow)
+
+    async_to_sync(AsyncWorkflowExecutor(flow).arun_flow)(user=test_user)
+
+    assert flow.tasks.get(step_id="wait").run_after > timezone.now()
+    assert not flow.tasks.filter(step_id="finish").exists()
+
+    make_due(flow)
+    async_to_sync(AsyncWorkflowExecutor(flow).arun_flow)(user=test_user)
+
+    flow.refresh_from_db()
+    assert flow.is_complete
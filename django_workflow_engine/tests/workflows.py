@@ -1,9 +1,16 @@
 from django_workflow_engine import COMPLETE
 from django_workflow_engine.dataclass import Step, Workflow
+from django_workflow_engine.tasks import BulkSendEmail, SendEmail
 from django_workflow_engine.tasks.previous_tasks_complete import (
     PreviousTasksCompleteTask,
 )
-from django_workflow_engine.tests.tasks import BasicTask, InvalidTargetTask, PauseTask
+from django_workflow_engine.tests.tasks import (
+    BasicTask,
+    InvalidTargetTask,
+    ManualTask,
+    PauseTask,
+    WaitTask,
+)
 
 """
 Test workflow definitions
@@ -170,6 +177,28 @@ pause_task_workflow = Workflow(
         ),
     ],
 )
+manual_task_workflow = Workflow(
+    name="manual_task_workflow",
+    steps=[
+        Step(
+            step_id="start",
+            task_name=BasicTask.task_name,
+            start=True,
+            targets=["manual"],
+        ),
+        Step(
+            step_id="manual",
+            task_name=ManualTask.task_name,
+            targets=["end"],
+        ),
+        Step(
+            step_id="end",
+            task_name=BasicTask.task_name,
+            targets=COMPLETE,
+        ),
+    ],
+)
+
 self_ref_pause_task_workflow = Workflow(
     name="self_ref_pause_task_workflow",
     steps=[
@@ -303,3 +332,86 @@ invalid_task_target_workflow = Workflow(
         ),
     ],
 )
+
+
+fan_out_workflow = Workflow(
+    name="fan_out_workflow",
+    steps=[
+        Step(
+            step_id="start",
+            task_name=BasicTask.task_name,
+            start=True,
+            targets=[f"task_{i}" for i in range(20)],
+        ),
+        *[
+            Step(
+                step_id=f"task_{i}",
+                task_name=BasicTask.task_name,
+                targets=COMPLETE,
+            )
+            for i in range(20)
+        ],
+    ],
+)
+
+
+send_email_workflow = Workflow(
+    name="send_email_workflow",
+    steps=[
+        Step(
+            step_id="send_email",
+            task_name=SendEmail.task_name,
+            start=True,
+            targets=COMPLETE,
+            task_info={
+                "subject": "Hello",
+                "message": "Hello {{ flow.flow_name }}",
+                "from_email": "from@example.com",
+                "recipient_list": ["to@example.com"],
+            },
+        ),
+    ],
+)
+
+
+bulk_send_email_workflow = Workflow(
+    name="bulk_send_email_workflow",
+    steps=[
+        Step(
+            step_id="notify_managers",
+            task_name=BulkSendEmail.task_name,
+            start=True,
+            targets=COMPLETE,
+            task_info={
+                "subject": "New flow",
+                "message": "Hello {{ recipient.name }}, {{ flow.flow_name }} started",
+                "from_email": "from@example.com",
+                "recipients_key": "managers",
+                "chunk_size": 2,
+            },
+        ),
+    ],
+)
+
+
+wait_workflow = Workflow(
+    name="wait_workflow",
+    steps=[
+        Step(
+            step_id="start",
+            task_name=BasicTask.task_name,
+            start=True,
+            targets=["wait"],
+        ),
+        Step(
+            step_id="wait",
+            task_name=WaitTask.task_name,
+            targets=["finish"],
+        ),
+        Step(
+            step_id="finish",
+            task_name=BasicTask.task_name,
+            targets=COMPLETE,
+        ),
+    ],
+)
@@ -1,13 +1,28 @@
 """django_workflow_engine utils."""
+from datetime import timedelta
 from typing import Dict, Type, Union, cast
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils.module_loading import import_string
 
 from django_workflow_engine.dataclass import Workflow
 
 from .exceptions import WorkflowImproperlyConfigured
 
+# How long a flow is leased to the process running it, unless renewed.
+DEFAULT_LEASE_SECONDS = 300
+
+# Tasks are run one after another unless DJANGO_WORKFLOW_PARALLEL_WORKERS is set.
+DEFAULT_PARALLEL_WORKERS = 1
+
+# Emails are sent while the task runs unless DJANGO_WORKFLOW_EMAIL_OUTBOX is set.
+DEFAULT_EMAIL_OUTBOX = False
+
+# Workflows that have been loaded, keyed by their DJANGO_WORKFLOWS display name.
+_workflow_registry: Dict[str, Workflow] = {}
+
 
 def build_workflow_choices(workflows):
     """Build workflow choices.
@@ -37,12 +52,13 @@ def lookup_workflow(workflow_name) -> Workflow:
     :returns (class): The requested workflow class.
     :raises (WorkflowImproperlyConfigured): If workflow not found.
     """
+    if workflow_name in _workflow_registry:
+        return _workflow_registry[workflow_name]
+
+    if workflow_name not in settings.DJANGO_WORKFLOWS:
+        raise WorkflowImproperlyConfigured(f"Cannot find workflow: {workflow_name}")
 
-    for display_name, workflow_path in settings.DJANGO_WORKFLOWS.items():
-        if display_name == workflow_name:
-            workflow_class = load_workflow(display_name)
-            return workflow_class
-    raise WorkflowImproperlyConfigured(f"Cannot find workflow: {display_name}")
+    return load_workflow(workflow_name)
 
 
 def load_workflow(workflow_key) -> Workflow:
@@ -51,21 +67,75 @@ def load_workflow(workflow_key) -> Workflow:
     Given a workflow path, extrapolates the containing package/modules, imports
     it and loads specified class.
 
+    Workflows are loaded and compiled once per process, subsequent calls return
+    the registered workflow until `DJANGO_WORKFLOWS` changes.
+
     :param (str) workflow_path: Module path of the work flow including
         class e.g: 'workflows.onboard_contractor.OnboardContractor'
     :returns (class): The workflow class.
     """
+    if workflow_key in _workflow_registry:
+        return _workflow_registry[workflow_key]
+
     workflows = cast(Dict[str, Union[Workflow, str]], settings.DJANGO_WORKFLOWS)
     class_or_str = workflows[workflow_key]
 
     if type(class_or_str) is Workflow:
-        return class_or_str
+        workflow = class_or_str
+    else:
+        assert type(class_or_str) is str
+
+        try:
+            workflow = import_string(class_or_str)
+        except (ModuleNotFoundError, ImportError, AttributeError) as e:
+            raise WorkflowImproperlyConfigured(
+                f"Failed to load workflow from '{class_or_str}': {e}"
+            )
+
+    if isinstance(workflow, Workflow):
+        # Compile the workflow graph now rather than on first use.
+        workflow.graph
+
+    _workflow_registry[workflow_key] = workflow
+    return workflow
+
+
+def clear_workflow_registry() -> None:
+    """Forget every loaded workflow, they will be loaded again on next use."""
+    _workflow_registry.clear()
 
-    assert type(class_or_str) is str
 
-    try:
-        return import_string(class_or_str)
-    except (ModuleNotFoundError, ImportError, AttributeError) as e:
-        raise WorkflowImproperlyConfigured(
-            f"Failed to load workflow from '{class_or_str}': {e}"
+@receiver(setting_changed)
+def clear_workflow_registry_on_setting_changed(*, setting, **kwargs) -> None:
+    if setting == "DJANGO_WORKFLOWS":
+        clear_workflow_registry()
+
+
+def get_lease_duration() -> timedelta:
+    """How long a flow is leased to the process running it.
+
+    Configured with the `DJANGO_WORKFLOW_LEASE_SECONDS` setting.
+    """
+    return timedelta(
+        seconds=getattr(
+            settings, "DJANGO_WORKFLOW_LEASE_SECONDS", DEFAULT_LEASE_SECONDS
         )
+    )
+
+
+def get_parallel_workers() -> int:
+    """How many tasks of a wave the executor may run at the same time.
+
+    Configured with the `DJANGO_WORKFLOW_PARALLEL_WORKERS` setting.
+    """
+    return getattr(
+        settings, "DJANGO_WORKFLOW_PARALLEL_WORKERS", DEFAULT_PARALLEL_WORKERS
+    )
+
+
+def email_outbox_enabled() -> bool:
+    """Whether tasks queue emails in the outbox rather than sending them.
+
+    Configured with the `DJANGO_WORKFLOW_EMAIL_OUTBOX` setting.
+    """
+    return getattr(settings, "DJANGO_WORKFLOW_EMAIL_OUTBOX", DEFAULT_EMAIL_OUTBOX)
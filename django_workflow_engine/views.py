@@ -1,14 +1,23 @@
+import hashlib
+import json
 import logging
+from datetime import datetime
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, TypedDict, cast
 
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import PermissionDenied
+from django.core.signals import setting_changed
+from django.db import connection
+from django.db.models import Count, Max, OuterRef, Q, QuerySet, Subquery
+from django.dispatch import receiver
 from django.http import HttpRequest
 from django.http.response import Http404, HttpResponse, HttpResponseBase, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.views import View
 from django.views.generic import TemplateView
 from django.views.generic.detail import DetailView
@@ -36,6 +45,22 @@ class FlowListView(ListView):
     paginate_by = 100  # if pagination is desired
     ordering = "-started"
 
+    def get_queryset(self) -> QuerySet[Flow]:
+        # Annotate the step id of each flow's current TaskStatus, so that
+        # `Flow.on_manual_step` doesn't query per row.
+        current_task_statuses = TaskStatus.objects.filter(
+            flow=OuterRef("pk"), done=False, executed_at__isnull=True
+        ).order_by("pk")
+
+        return (
+            super()
+            .get_queryset()
+            .select_related("executed_by")
+            .annotate(
+                current_step_id=Subquery(current_task_statuses.values("step_id")[:1])
+            )
+        )
+
 
 class FlowView(DetailView):
     model = Flow
@@ -177,15 +202,60 @@ class FlowContinueView(TemplateView):
 
 
 class FlowDiagramView(View):
+    """The cytoscape elements of a flow's diagram, as JSON.
+
+    Responses carry an `ETag` and `Last-Modified` derived from the flow's
+    TaskStatuses, so clients polling the diagram get a `304 Not Modified`
+    without the elements being built until a TaskStatus changes.
+    """
+
     def get(
         self, request: HttpRequest, pk: int, *args: Any, **kwargs: Any
     ) -> HttpResponse:
+        # The aggregates of the flow's TaskStatuses that change when it runs.
+        aggregates: Dict[str, Any] = {
+            "task_count": Count("tasks"),
+            "done_count": Count("tasks", filter=Q(tasks__done=True)),
+            "executed_count": Count("tasks__executed_at"),
+            "last_started_at": Max("tasks__started_at"),
+            "last_executed_at": Max("tasks__executed_at"),
+        }
         try:
-            flow: Flow = Flow.objects.get(pk=pk)
+            flow: Flow = Flow.objects.annotate(**aggregates).get(pk=pk)
         except Flow.DoesNotExist:
             raise Http404(f"Flow {pk} not found")
-        elements = workflow_to_cytoscape_elements(flow)
-        return JsonResponse({"elements": elements})
+        tasks: Dict[str, Any] = {name: getattr(flow, name) for name in aggregates}
+
+        topology = get_workflow_topology(flow)
+        etag = quote_etag(
+            hashlib.sha256(
+                (
+                    f"{topology['version']}:{tasks['task_count']}:"
+                    f"{tasks['done_count']}:{tasks['executed_count']}:"
+                    f"{tasks['last_started_at']}:{tasks['last_executed_at']}"
+                ).encode()
+            ).hexdigest()
+        )
+        last_modified: Optional[datetime] = max(
+            filter(None, [tasks["last_started_at"], tasks["last_executed_at"]]),
+            default=None,
+        )
+        last_modified_timestamp = (
+            int(last_modified.timestamp()) if last_modified else None
+        )
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified_timestamp
+        )
+        if response is None:
+            elements = workflow_to_cytoscape_elements(flow)
+            response = JsonResponse({"elements": elements})
+
+        response.headers["ETag"] = etag
+        if last_modified_timestamp is not None:
+            response.headers["Last-Modified"] = http_date(last_modified_timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 class Node(TypedDict):
@@ -212,57 +282,120 @@ class EdgeData(TypedDict):
     data: Edge
 
 
+class Topology(TypedDict):
+    nodes: List[Node]
+    edges: List[EdgeData]
+    version: str
+
+
+# The static part of each workflow's diagram, keyed by workflow name. It only
+# depends on the workflow definition, so is built once per process.
+_workflow_topologies: Dict[str, Topology] = {}
+
+
+@receiver(setting_changed)
+def clear_workflow_topologies_on_setting_changed(*, setting, **kwargs) -> None:
+    if setting == "DJANGO_WORKFLOWS":
+        _workflow_topologies.clear()
+
+
 def workflow_to_cytoscape_elements(flow: Flow):
+    topology = get_workflow_topology(flow)
+    latest_task_statuses = get_latest_task_statuses(flow)
+
     nodes: List[NodeData] = [
         {
-            "data": step_to_node(flow, step),
+            "data": node_with_status(node, latest_task_statuses.get(node["id"])),
         }
-        for step in flow.workflow.steps
+        for node in topology["nodes"]
     ]
 
-    edges: List[EdgeData] = [
-        {
-            "data": {
-                "id": f"{step.step_id}{target}",
-                "source": step.step_id,
-                "target": target,
+    return {"nodes": nodes, "edges": topology["edges"]}
+
+
+def get_workflow_topology(flow: Flow) -> Topology:
+    """Get the nodes and edges of a flow's workflow, without the flow's state.
+
+    :param (Flow) flow: The flow to get the workflow topology of.
+    :returns (Topology): The nodes, edges and a version that changes when
+        either of them does.
+    """
+    if flow.workflow_name not in _workflow_topologies:
+        nodes: List[Node] = [step_to_node(step) for step in flow.workflow.steps]
+        edges: List[EdgeData] = [
+            {
+                "data": {
+                    "id": f"{step.step_id}{target}",
+                    "source": step.step_id,
+                    "target": target,
+                }
             }
+            for step in flow.workflow.steps
+            if step.targets != COMPLETE
+            for target in step.targets
+            if target
+        ]
+        version = hashlib.sha256(
+            json.dumps([nodes, edges], sort_keys=True).encode()
+        ).hexdigest()
+
+        _workflow_topologies[flow.workflow_name] = {
+            "nodes": nodes,
+            "edges": edges,
+            "version": version,
         }
-        for step in flow.workflow.steps
-        if step.targets != COMPLETE
-        for target in step.targets
-        if target
-    ]
 
-    return {"nodes": nodes, "edges": edges}
+    return _workflow_topologies[flow.workflow_name]
 
 
-def step_to_node(flow: Flow, step: Step) -> Node:
-    latest_step_task: Optional[TaskStatus] = (
-        flow.tasks.order_by("started_at").filter(step_id=step.step_id).last()
-    )
+def get_latest_task_statuses(flow: Flow) -> Dict[str, TaskStatus]:
+    """Get the most recently started TaskStatus of each step, in one query.
 
-    targets = step.targets
+    :param (Flow) flow: The flow to get the TaskStatuses of.
+    :returns (dict): Step id to the latest TaskStatus of that step.
+    """
+    task_statuses = flow.tasks.all()
 
-    end = not bool(targets)
-    done = bool(latest_step_task and latest_step_task.done)
-    current = bool(latest_step_task and not latest_step_task.executed_at)
+    if connection.features.can_distinct_on_fields:
+        task_statuses = task_statuses.order_by(
+            "step_id", "-started_at", "-pk"
+        ).distinct("step_id")
+        return {task_status.step_id: task_status for task_status in task_statuses}
+
+    # Later TaskStatuses replace earlier ones of the same step.
+    return {
+        task_status.step_id: task_status
+        for task_status in task_statuses.order_by("started_at", "pk")
+    }
 
-    label = step.description or format_step_id(step.step_id)
-    if end and done:
-        label += " ✓"
+
+def step_to_node(step: Step) -> Node:
+    targets = step.targets
 
     return {
         "id": step.step_id,
-        "label": label,
+        "label": step.description or format_step_id(step.step_id),
         "start": bool(step.start),
-        "end": end,
+        "end": not bool(targets),
         "decision": len(targets) > 1,
-        "done": done,
-        "current": current,
+        "done": False,
+        "current": False,
     }
 
 
+def node_with_status(node: Node, latest_step_task: Optional[TaskStatus]) -> Node:
+    done = bool(latest_step_task and latest_step_task.done)
+    current = bool(latest_step_task and not latest_step_task.executed_at)
+
+    status_node = node.copy()
+    status_node["done"] = done
+    status_node["current"] = current
+    if node["end"] and done:
+        status_node["label"] += " ✓"
+
+    return status_node
+
+
 def format_step_id(step_id: str) -> str:
     # email_all_users -> Email all users
     return step_id.replace("_", " ").title()
@@ -0,0 +1,148 @@
+"""django_workflow_engine background worker.
+
+Flows only progress when something calls `WorkflowExecutor.run_flow`. The
+worker finds flows that have automatic steps waiting to run, leases them and
+runs them, so that steps such as reminders progress without a user visiting
+the flow. See the `run_workflow_worker` management command.
+"""
+import logging
+import os
+import socket
+import uuid
+from typing import List
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from django_workflow_engine.executor import WorkflowExecutor
+from django_workflow_engine.models import Flow, TaskStatus
+from django_workflow_engine.tasks import Task
+from django_workflow_engine.utils import get_lease_duration, load_workflow
+
+logger = logging.getLogger(__name__)
+
+
+def generate_worker_id() -> str:
+    """An id for a worker, used as the owner of the flows it leases."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def get_auto_task_names() -> List[str]:
+    """The names of the automatic tasks.
+
+    Loads the configured workflows first, so that the tasks they use are
+    registered.
+    """
+    for workflow_key in settings.DJANGO_WORKFLOWS:
+        load_workflow(workflow_key)
+
+    return [task_name for task_name, task in Task.tasks.items() if task.auto]
+
+
+def runnable_flows() -> QuerySet[Flow]:
+    """Unfinished flows that aren't leased and have automatic steps that are
+    due to run.
+
+    The flows are found from their TaskStatuses: the scheduled ones that are
+    due, with a range scan of `task_status_run_after_idx`, and the unexecuted
+    ones that aren't scheduled.
+    """
+    auto_task_names = get_auto_task_names()
+    now = timezone.now()
+
+    unexecuted = TaskStatus.objects.filter(
+        executed_at__isnull=True, task_name__in=auto_task_names
+    )
+    due = unexecuted.filter(run_after__isnull=False, run_after__lte=now)
+    unscheduled = unexecuted.filter(run_after__isnull=True)
+
+    return (
+        Flow.objects.filter(finished__isnull=True)
+        .filter(Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now))
+        .filter(
+            Q(pk__in=due.values("flow_id")) | Q(pk__in=unscheduled.values("flow_id"))
+        )
+        .order_by("pk")
+    )
+
+
+def claim_runnable_flows(worker_id: str, batch_size: int) -> List[int]:
+    """Lease a batch of runnable flows to a worker.
+
+    On databases that support it the candidate rows are locked with
+    `SELECT ... FOR UPDATE SKIP LOCKED`, so workers polling at the same time
+    claim different flows. The lease is then taken with a conditional UPDATE,
+    so a flow is never claimed twice.
+
+    :param (str) worker_id: The worker taking the leases.
+    :param (int) batch_size: The maximum number of flows to claim.
+    :returns (list[int]): The primary keys of the claimed flows.
+    """
+    with transaction.atomic():
+        candidates = runnable_flows()
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        candidate_pks = list(candidates.values_list("pk", flat=True)[:batch_size])
+
+        if not candidate_pks:
+            return []
+
+        now = timezone.now()
+        Flow.objects.filter(pk__in=candidate_pks).filter(
+            Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now)
+        ).update(lease_owner=worker_id, lease_expires_at=now + get_lease_duration())
+
+    return list(
+        Flow.objects.filter(pk__in=candidate_pks, lease_owner=worker_id)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def run_claimed_flow(flow_pk: int, worker_id: str) -> bool:
+    """Run a flow that has been claimed by a worker, as the flow's creator.
+
+    Intended to be run in a thread or process pool, exceptions are logged
+    rather than raised and the thread's database connection is closed after.
+
+    :returns (bool): Whether the flow made progress, i.e. it finished or a
+        step was executed and not queued up again. A flow whose steps only
+        asked to be retried (e.g. `([], False)`) made none.
+    """
+    try:
+        started = timezone.now()
+        flow = Flow.objects.select_related("executed_by").get(pk=flow_pk)
+        executor = WorkflowExecutor(flow, lease_owner=worker_id)
+        executor.run_flow(user=flow.executed_by)
+        return (
+            bool(flow.finished) or flow.tasks.filter(executed_at__gte=started).exists()
+        )
+    except Exception as e:
+        logger.exception(e)
+        return False
+    finally:
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def release_claimed_flows(worker_id: str) -> None:
+    """Give up every lease held by a worker."""
+    Flow.objects.filter(lease_owner=worker_id).update(
+        lease_owner=None, lease_expires_at=None
+    )
+
+
+def init_worker_process() -> None:
+    """Initialise a process in a process pool.
+
+    Sets Django up when the process wasn't forked, and closes the database
+    connections a forked process inherited, so that it opens its own rather
+    than sharing the parent's.
+    """
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
@@ -30,6 +30,10 @@ class Migration(migrations.Migration):
         ("django_workflow_engine", "0011_migrate_from_taskrecordexecutions"),
         ("workflow", "0001_data_migration_with_all_models"),
     ]
+    # TaskRecordExecution is removed by 0016.
+    run_before = [
+        ("django_workflow_engine", "0016_delete_legacy_task_records"),
+    ]
 
     operations = [
         migrations.RunPython(data_migration_on_all_models, migrations.RunPython.noop),
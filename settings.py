@@ -35,6 +35,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # A file rather than an in-memory database, so that the worker's
+        # process pool can be tested.
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 